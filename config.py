@@ -1,49 +1,85 @@
 import os
 
+from gi.repository import Gtk
 from ignis.app import IgnisApp
 from ignis.css_manager import CssInfoPath, CssManager
 from ignis.services.niri import NiriService
-from ignis.utils import get_n_monitors, sass_compile
-
-from modules.prelude import post_initialized
-from modules.windows import (
-    AppDock,
-    AppLauncher,
-    ControlCenter,
-    FcitxKimPopup,
-    NotificationPopups,
-    OnscreenDisplay,
-    OverlayBackdrop,
-    Preferences,
-    Topbar,
-    WallpaperWindow,
+
+from modules.utils.trace import (
+    finish_trace_after,
+    finish_trace_on_first_frame,
+    trace_span,
 )
 
+with trace_span("import modules"):
+    from modules.prelude import post_initialized
+    from modules.utils import ScssWatcher, compile_scss_cached
+    from modules.windows import (
+        AppDock,
+        AppLauncher,
+        ControlCenter,
+        FcitxKimPopup,
+        MonitorManager,
+        NotificationPopups,
+        OnscreenDisplay,
+        OverlayBackdrop,
+        Preferences,
+        Topbar,
+        WallpaperWindow,
+        WindowName,
+        lazy_windows,
+    )
+
 app = IgnisApp.get_initialized()
 css_manager = CssManager.get_default()
 niri = NiriService.get_default()
 
 config_dir = os.path.dirname(os.path.abspath(__file__))
-css_manager.apply_css(
-    CssInfoPath(
-        name="main", path=os.path.join(config_dir, "style.scss"), compiler_function=lambda path: sass_compile(path=path)
+style_path = os.path.join(config_dir, "style.scss")
+with trace_span("apply_css"):
+    css_manager.apply_css(
+        CssInfoPath(name="main", path=style_path, compiler_function=compile_scss_cached, autoreload=False)
     )
-)
+    css_watcher = ScssWatcher("main", style_path)
+
+# built on first opened
+lazy_windows.register(WindowName.app_launcher, AppLauncher)
+lazy_windows.register(WindowName.control_center, ControlCenter)
+lazy_windows.register(WindowName.preferences, Preferences)
+# warms the launcher up once startup settles, which is disposed after the dispose delay if unused
+lazy_windows.prewarm(WindowName.app_launcher)
 
-AppLauncher()
-ControlCenter()
-FcitxKimPopup()
-NotificationPopups()
-OnscreenDisplay()
-Preferences()
+# shown by services, thus built at startup
+with trace_span("FcitxKimPopup"):
+    FcitxKimPopup()
+with trace_span("NotificationPopups"):
+    NotificationPopups()
+with trace_span("OnscreenDisplay"):
+    OnscreenDisplay()
 
-for idx in range(get_n_monitors()):
-    Topbar(idx)
-    AppDock(idx)
-    OverlayBackdrop(idx)
 
-    WallpaperWindow(idx)
+def create_monitor_windows(idx: int, connector: str) -> list[Gtk.Window]:
+    windows: list[Gtk.Window] = []
+    with trace_span("Topbar", monitor=idx):
+        windows.append(Topbar(idx, connector))
+        if idx == 0:
+            finish_trace_on_first_frame(windows[-1])
+    with trace_span("AppDock", monitor=idx):
+        windows.append(AppDock(idx, connector))
+    with trace_span("OverlayBackdrop", monitor=idx):
+        windows.append(OverlayBackdrop(idx, connector))
+
+    with trace_span("WallpaperWindow", monitor=idx):
+        windows.append(WallpaperWindow(idx, connector=connector))
     if niri.is_available:
-        WallpaperWindow(idx, is_backdrop=True)
+        with trace_span("WallpaperWindow", monitor=idx, is_backdrop=True):
+            windows.append(WallpaperWindow(idx, is_backdrop=True, connector=connector))
+
+    return windows
+
+
+monitor_manager = MonitorManager(create_monitor_windows)
+# in case the first topbar never maps
+finish_trace_after(10000)
 
 post_initialized()
@@ -4,6 +4,7 @@ from ignis.services.niri import NiriService
 
 from ..useroptions import user_options
 from ..utils import (
+    connect_coalesced,
     get_app_icon_name,
     get_app_id,
     gtk_template,
@@ -38,10 +39,10 @@ class ActiveWindow(Gtk.CenterBox):
         set_on_scroll(self, self.__class__.__on_scroll)
 
         if self.__niri.is_available:
-            self.__niri.connect("notify::active-window", self.__on_change)
+            connect_coalesced(self.__niri, "notify::active-window", self.__on_change)
 
         if self.__hypr.is_available:
-            self.__hypr.connect("notify::active-window", self.__on_change)
+            connect_coalesced(self.__hypr, "notify::active-window", self.__on_change)
 
     @property
     def has_active_window(self) -> bool:
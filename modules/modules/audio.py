@@ -1,11 +1,8 @@
 from ignis.services.audio import AudioService, Stream
 from ignis.widgets import Box, Icon
-from ignis.window_manager import WindowManager
 
 from ..constants import WindowName
-from ..utils import set_on_click
-
-wm = WindowManager.get_default()
+from ..utils import lazy_windows, set_on_click
 
 
 class Audio(Box):
@@ -23,7 +20,7 @@ class Audio(Box):
             set_on_click(
                 self,
                 left=lambda _: stream.set_is_muted(not stream.is_muted),
-                right=lambda _: wm.toggle_window(WindowName.control_center.value),
+                right=lambda _: lazy_windows.toggle(WindowName.control_center),
             )
 
     def __init__(self):
@@ -4,7 +4,6 @@ from gi.repository import Gio, Gtk
 from ignis.services.hyprland import HyprlandService
 from ignis.services.niri import NiriService
 from ignis.services.upower import UPowerDevice, UPowerService
-from ignis.window_manager import WindowManager
 
 from ..constants import WindowName
 from ..utils import (
@@ -12,13 +11,13 @@ from ..utils import (
     get_widget_monitor_id,
     gtk_template,
     gtk_template_child,
+    lazy_windows,
     niri_action,
     run_cmd_async,
     set_on_click,
+    weak_connect,
 )
 
-wm = WindowManager.get_default()
-
 
 @gtk_template("modules/batteries")
 class Batteries(Gtk.Box):
@@ -98,11 +97,11 @@ class Batteries(Gtk.Box):
         self.__add_action("logout", self.__logout_session)
 
         set_on_click(
-            self, left=lambda s: s.popover.popup(), right=lambda _: wm.toggle_window(WindowName.control_center.value)
+            self, left=lambda s: s.popover.popup(), right=lambda _: lazy_windows.toggle(WindowName.control_center)
         )
 
-        self.__service.connect("battery_added", self.__on_battery_added)
-        self.__service.connect("notify::batteries", self.__on_change)
+        weak_connect(self.__service, "battery_added", self.__on_battery_added)
+        weak_connect(self.__service, "notify::batteries", self.__on_change)
         self.__on_change()
 
     @classmethod
@@ -1,14 +1,12 @@
 from gi.repository import Gtk
 from ignis.app import IgnisApp
 from ignis.widgets import Box, Icon, Window
-from ignis.window_manager import WindowManager
 
 from ..constants import WindowName
-from ..utils import set_on_click
+from ..utils import lazy_windows, set_on_click, weak_connect
 from ..variables import caffeine_state
 
 app = IgnisApp.get_initialized()
-wm = WindowManager.get_default()
 
 
 class CaffeineIndicator(Box):
@@ -23,7 +21,7 @@ class CaffeineIndicator(Box):
             visible=False,
             child=[Icon(image="my-caffeine-on-symbolic")],
         )
-        self.__state.connect("notify::value", self.__on_changed)
+        weak_connect(self.__state, "notify::value", self.__on_changed)
         set_on_click(self, left=self.__on_clicked, right=self.__on_right_clicked)
 
     def __on_changed(self, *_):
@@ -44,4 +42,4 @@ class CaffeineIndicator(Box):
         self.__state.value = not self.__state.value
 
     def __on_right_clicked(self, *_):
-        wm.toggle_window(WindowName.control_center.value)
+        lazy_windows.toggle(WindowName.control_center)
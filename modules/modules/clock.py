@@ -3,12 +3,9 @@ import math
 
 from gi.repository import Gtk
 from ignis.utils import Poll
-from ignis.window_manager import WindowManager
 
 from ..constants import WindowName
-from ..utils import gtk_template, gtk_template_child, set_on_click
-
-wm = WindowManager.get_default()
+from ..utils import gtk_template, gtk_template_child, lazy_windows, set_on_click
 
 
 @gtk_template("modules/clock")
@@ -42,4 +39,4 @@ class Clock(Gtk.Box):
         self.popover.popup()
 
     def __on_right_clicked(self, *_):
-        wm.toggle_window(WindowName.control_center.value)
+        lazy_windows.toggle(WindowName.control_center)
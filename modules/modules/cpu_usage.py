@@ -2,7 +2,7 @@ import os
 from gi.repository import Gtk
 
 from ..services import CpuLoadService
-from ..utils import GProperty
+from ..utils import GProperty, weak_connect
 from .command_pill import CommandPill
 
 
@@ -14,7 +14,7 @@ class CpuUsagePill(CommandPill):
         super().__init__()
 
         self.__cpu = CpuLoadService.get_default()
-        self.__cpu.connect("notify::total-time", self.__on_updated)
+        weak_connect(self.__cpu, "notify::total-time", self.__on_updated)
 
     @GProperty(type=int)
     def interval(self) -> int:
@@ -1,11 +1,8 @@
 from ignis.options import options
 from ignis.widgets import Box, Icon
-from ignis.window_manager import WindowManager
 
 from ..constants import WindowName
-from ..utils import connect_option, set_on_click
-
-wm = WindowManager.get_default()
+from ..utils import connect_option, lazy_windows, set_on_click
 
 
 class DndIndicator(Box):
@@ -32,4 +29,4 @@ class DndIndicator(Box):
             self.__options.dnd = not self.__options.dnd
 
     def __on_right_clicked(self, *_):
-        wm.toggle_window(WindowName.control_center.value)
+        lazy_windows.toggle(WindowName.control_center)
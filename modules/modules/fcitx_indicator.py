@@ -5,7 +5,7 @@ from ignis.variable import Variable
 from ignis.widgets import Box, Icon, Label, PopoverMenu
 
 from ..services import FcitxStateService
-from ..utils import set_on_click
+from ..utils import set_on_click, weak_connect
 
 
 class FcitxIndicator(Box):
@@ -23,9 +23,9 @@ class FcitxIndicator(Box):
         )
 
         self.__fcitx = FcitxStateService.get_default()
-        self.__fcitx.kimpanel.connect("notify::enabled", self.__on_fcitx_enabled)
-        self.__fcitx.kimpanel.connect("notify::fcitx-im", self.__on_fcitx_state_changed)
-        self.__fcitx.kimpanel.connect("exec-menu", self.__on_fcitx_exec_menu)
+        weak_connect(self.__fcitx.kimpanel, "notify::enabled", self.__on_fcitx_enabled)
+        weak_connect(self.__fcitx.kimpanel, "notify::fcitx-im", self.__on_fcitx_state_changed)
+        weak_connect(self.__fcitx.kimpanel, "exec-menu", self.__on_fcitx_exec_menu)
 
         set_on_click(self, left=self.__class__.__on_clicked, right=self.__class__.__on_right_clicked)
 
@@ -3,12 +3,18 @@ import asyncio
 from gi.repository import GObject, Gtk
 from ignis.services.mpris import ART_URL_CACHE_DIR, MprisPlayer, MprisService
 from ignis.widgets import Box
-from ignis.window_manager import WindowManager
 
 from ..constants import WindowName
-from ..utils import SpecsBase, clear_dir, format_time_duration, gtk_template, gtk_template_child, set_on_click
-
-wm = WindowManager.get_default()
+from ..utils import (
+    SpecsBase,
+    clear_dir,
+    format_time_duration,
+    gtk_template,
+    gtk_template_child,
+    lazy_windows,
+    set_on_click,
+    weak_connect,
+)
 
 
 class Mpris(Box):
@@ -80,7 +86,7 @@ class Mpris(Box):
                 ),
             )
 
-            set_on_click(self, right=lambda _: wm.toggle_window(WindowName.control_center.value))
+            set_on_click(self, right=lambda _: lazy_windows.toggle(WindowName.control_center))
 
         def do_dispose(self):
             self.clear_specs()
@@ -106,7 +112,7 @@ class Mpris(Box):
     def __init__(self):
         self.__service = MprisService.get_default()
         super().__init__(vertical=True)
-        self.__service.connect("player-added", self.__on_player_added)
+        weak_connect(self.__service, "player-added", self.__on_player_added)
 
     def __on_player_added(self, _, player: MprisPlayer):
         self.append(self.MprisItem(player))
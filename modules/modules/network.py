@@ -1,11 +1,8 @@
 from ignis.services.network import Ethernet, NetworkService, Wifi
 from ignis.widgets import Box, Icon
-from ignis.window_manager import WindowManager
 
 from ..constants import WindowName
-from ..utils import set_on_click
-
-wm = WindowManager.get_default()
+from ..utils import lazy_windows, set_on_click, weak_connect
 
 
 class Network(Box):
@@ -17,7 +14,7 @@ class Network(Box):
         def __init__(self, ethernet: Ethernet):
             self.__ethernet = ethernet
             super().__init__(css_classes=["px-1"], child=[Icon(image=ethernet.bind("icon_name"))])
-            ethernet.connect("notify::is-connected", self.__on_change)
+            weak_connect(ethernet, "notify::is-connected", self.__on_change)
             self.__on_change()
             set_on_click(self, left=self.__class__.__on_clicked, right=self.__class__.__on_clicked)
 
@@ -26,7 +23,7 @@ class Network(Box):
             self.set_tooltip_text("Connected" if connected else "Disconnected")
 
         def __on_clicked(self, *_):
-            wm.toggle_window(WindowName.control_center.value)
+            lazy_windows.toggle(WindowName.control_center)
 
     class NetworkWifi(Box):
         __gtype_name__ = "IgnisNetworkWifi"
@@ -34,13 +31,13 @@ class Network(Box):
         def __init__(self, wifi: Wifi):
             self.__wifi = wifi
             super().__init__(css_classes=["px-1"], child=[Icon(image=wifi.bind("icon_name"))])
-            wifi.connect("notify::enabled", self.__on_change)
-            wifi.connect("notify::is-connected", self.__on_change)
+            weak_connect(wifi, "notify::enabled", self.__on_change)
+            weak_connect(wifi, "notify::is-connected", self.__on_change)
             self.__on_change()
             set_on_click(
                 self,
                 left=self.__class__.__on_clicked,
-                right=lambda _: wm.toggle_window(WindowName.control_center.value),
+                right=lambda _: lazy_windows.toggle(WindowName.control_center),
             )
 
         def __on_change(self, *_):
@@ -6,7 +6,7 @@ from ignis.dbus_menu import DBusMenu
 from ignis.services.system_tray import SystemTrayItem, SystemTrayService
 from ignis.widgets import Icon
 
-from ..utils import SpecsBase, set_on_click, set_on_scroll
+from ..utils import SpecsBase, set_on_click, set_on_scroll, weak_connect
 
 
 class Tray(Gtk.FlowBox):
@@ -92,7 +92,7 @@ class Tray(Gtk.FlowBox):
         self.add_css_class("hover")
         self.add_css_class("rounded")
 
-        self.__service.connect("added", self.__on_item_added)
+        weak_connect(self.__service, "added", self.__on_item_added)
         self.__list_store = Gio.ListStore()
         self.bind_model(self.__list_store, lambda item: item)
         self.set_selection_mode(Gtk.SelectionMode.NONE)
@@ -102,7 +102,7 @@ class Tray(Gtk.FlowBox):
     def __on_item_added(self, _, tray_item: SystemTrayItem):
         item = self.TrayItem(tray_item)
         self.__list_store.insert(0, item)
-        tray_item.connect("removed", self.__on_item_removed)
+        weak_connect(tray_item, "removed", self.__on_item_removed)
 
     def __on_item_removed(self, tray_item: SystemTrayItem):
         found, pos = self.__list_store.find_with_equal_func(tray_item, lambda i, t: i.tray_item == t)
@@ -2,43 +2,41 @@ from gi.repository import Gtk
 from ignis.services.hyprland import HyprlandService, HyprlandWorkspace
 from ignis.services.niri import NiriService, NiriWorkspace
 
-from ..utils import SpecsBase, get_widget_monitor, niri_action, set_on_click, set_on_scroll
+from ..utils import connect_coalesced, get_widget_monitor, niri_action, set_on_click, set_on_scroll
 
 
 class Workspaces(Gtk.Box):
     __gtype_name__ = "NiriWorkspaces"
 
-    class WorkspaceItem(Gtk.Box, SpecsBase):
+    class WorkspaceItem(Gtk.Box):
         __gtype_name__ = "WorkspaceItem"
 
         def __init__(self):
-            self.__niri = NiriService.get_default()
-            self.__hypr = HyprlandService.get_default()
             self.__niri_ws: NiriWorkspace | None = None
             self.__hypr_ws: HyprlandWorkspace | None = None
+            self.__active: bool | None = None
+            self.__tooltip: str = ""
             super().__init__()
-            SpecsBase.__init__(self)
 
             self.__icon = Gtk.Image(icon_name="pager-checked-symbolic")
             self.append(self.__icon)
 
             set_on_click(self, left=self.__class__.__on_clicked)
-            if self.__niri.is_available:
-                self.signal(self.__niri, "notify::active-workspace", self.__on_changed)
-            if self.__hypr.is_available:
-                self.signal(self.__hypr, "notify::active-workspace", self.__on_changed)
-
-        def do_dispose(self):
-            self.clear_specs()
-            super().do_dispose()  # type: ignore
 
         @property
         def is_active(self) -> bool:
-            if self.__niri_ws:
-                return self.__niri_ws.is_active
-            if self.__hypr_ws:
-                return self.__hypr_ws.id == self.__hypr.active_workspace.id
-            return False
+            return self.__active or False
+
+        @is_active.setter
+        def is_active(self, active: bool):
+            if active == self.__active:
+                return
+
+            self.__active = active
+            if active:
+                self.remove_css_class("dimmed")
+            else:
+                self.add_css_class("dimmed")
 
         @property
         def niri_ws(self) -> NiriWorkspace | None:
@@ -47,7 +45,7 @@ class Workspaces(Gtk.Box):
         @niri_ws.setter
         def niri_ws(self, ws: NiriWorkspace):
             self.__niri_ws = ws
-            self.__on_changed()
+            self.__set_tooltip(f"Workspace {ws.name or ws.idx}")
 
         @property
         def hypr_ws(self) -> HyprlandWorkspace | None:
@@ -56,21 +54,12 @@ class Workspaces(Gtk.Box):
         @hypr_ws.setter
         def hypr_ws(self, ws: HyprlandWorkspace):
             self.__hypr_ws = ws
-            self.__on_changed()
+            self.__set_tooltip(f"Workspace {ws.name or ws.id}")
 
-        def __set_ws_active(self, active: bool):
-            if active:
-                self.remove_css_class("dimmed")
-            else:
-                self.add_css_class("dimmed")
-
-        def __on_changed(self, *_):
-            if self.__niri_ws:
-                self.set_tooltip_text(f"Workspace {self.__niri_ws.name or self.__niri_ws.idx}")
-                self.__set_ws_active(self.is_active)
-            if self.__hypr_ws:
-                self.set_tooltip_text(f"Workspace {self.__hypr_ws.name or self.__hypr_ws.id}")
-                self.__set_ws_active(self.is_active)
+        def __set_tooltip(self, tooltip: str):
+            if tooltip != self.__tooltip:
+                self.__tooltip = tooltip
+                self.set_tooltip_text(tooltip)
 
         def __on_clicked(self, *_):
             if self.__niri_ws:
@@ -82,7 +71,9 @@ class Workspaces(Gtk.Box):
         self.__niri = NiriService.get_default()
         self.__hypr = HyprlandService.get_default()
         self.__connector: str | None = None
-        self.__childs: list[Workspaces.WorkspaceItem] = []
+        self.__items: dict[int, Workspaces.WorkspaceItem] = {}
+        """Maps workspace ids to items, in display order."""
+        self.__active_id: int | None = None
         super().__init__()
 
         for css_class in ["hover", "rounded", "p-2"]:
@@ -92,40 +83,81 @@ class Workspaces(Gtk.Box):
         set_on_scroll(self, self.__class__.__on_scroll)
 
         if self.__niri.is_available:
-            self.__niri.connect("notify::workspaces", self.__on_change)
+            connect_coalesced(self.__niri, "notify::workspaces", self.__on_change)
+            connect_coalesced(self.__niri, "notify::active-workspace", self.__on_active_changed)
 
         if self.__hypr.is_available:
-            self.__hypr.connect("notify::workspaces", self.__on_change)
-
-    def __new_item(self, niri_ws: NiriWorkspace | None = None, hypr_ws: HyprlandWorkspace | None = None):
-        item = self.WorkspaceItem()
-        if niri_ws:
-            item.niri_ws = niri_ws
-        if hypr_ws:
-            item.hypr_ws = hypr_ws
-        return item
+            connect_coalesced(self.__hypr, "notify::workspaces", self.__on_change)
+            connect_coalesced(self.__hypr, "notify::active-workspace", self.__on_active_changed)
 
     def __on_realize(self):
         monitor = get_widget_monitor(self)
         if monitor:
             self.__connector = monitor.get_connector()
+        self.__on_change()
 
     def __on_change(self, *_):
-        for item in self.__childs:
+        workspaces: list[NiriWorkspace] | list[HyprlandWorkspace] = []
+        if self.__niri.is_available:
+            workspaces = [ws for ws in self.__niri.workspaces if ws.output == self.__connector]
+        elif self.__hypr.is_available:
+            workspaces = [ws for ws in self.__hypr.workspaces if ws.monitor == self.__connector]
+
+        # drop items of removed workspaces
+        ws_ids = {ws.id for ws in workspaces}
+        for ws_id in [ws_id for ws_id in self.__items if ws_id not in ws_ids]:
+            item = self.__items.pop(ws_id)
             self.remove(item)
             item.run_dispose()
-        self.__childs = []
-
+            if ws_id == self.__active_id:
+                self.__active_id = None
+
+        # reuse items by workspace id, and update them in place
+        items: dict[int, Workspaces.WorkspaceItem] = {}
+        for ws in workspaces:
+            item = self.__items.get(ws.id)
+            if not item:
+                item = self.WorkspaceItem()
+                item.is_active = False
+                self.append(item)
+            if isinstance(ws, NiriWorkspace):
+                item.niri_ws = ws
+            else:
+                item.hypr_ws = ws
+            items[ws.id] = item
+
+        # new items are appended, so reorder only if that differs from the workspace order
+        if list(items) != list(self.__items) + [ws_id for ws_id in items if ws_id not in self.__items]:
+            prev: Gtk.Widget | None = None
+            for item in items.values():
+                self.reorder_child_after(item, prev)
+                prev = item
+        self.__items = items
+
+        self.__on_active_changed()
+
+    def __on_active_changed(self, *_):
+        """
+        Dispatches active states, only touching the previous and the new active items.
+        """
+        active_id: int | None = None
         if self.__niri.is_available:
-            self.__childs = [
-                self.__new_item(niri_ws=ws) for ws in self.__niri.workspaces if ws.output == self.__connector
-            ]
-        if self.__hypr.is_available:
-            self.__childs = [
-                self.__new_item(hypr_ws=ws) for ws in self.__hypr.workspaces if ws.monitor == self.__connector
-            ]
-        for item in self.__childs:
-            self.append(item)
+            # niri keeps an active workspace per output
+            active_ids = [ws_id for ws_id, item in self.__items.items() if item.niri_ws and item.niri_ws.is_active]
+            active_id = active_ids[0] if active_ids else None
+        elif self.__hypr.is_available:
+            active_id = self.__hypr.active_workspace.id
+
+        if active_id == self.__active_id:
+            return
+
+        prev = self.__items.get(self.__active_id) if self.__active_id is not None else None
+        if prev:
+            prev.is_active = False
+        item = self.__items.get(active_id) if active_id is not None else None
+        if item:
+            item.is_active = True
+        self.__active_id = active_id
 
     def __on_scroll(self, dx: float, dy: float):
         if self.__niri.is_available:
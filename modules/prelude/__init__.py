@@ -1,7 +1,9 @@
 import modules.modules
 import modules.prelude.adw
+from modules.utils.trace import trace_span
 
 
 def post_initialized():
-    import modules.prelude.commands
-    import modules.prelude.overrides
+    with trace_span("post_initialized"):
+        import modules.prelude.commands
+        import modules.prelude.overrides
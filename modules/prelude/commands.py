@@ -1,28 +1,27 @@
 import asyncio
 from ignis.command_manager import CommandManager
 from ignis.exceptions import WindowNotFoundError
-from ignis.window_manager import WindowManager
 from ignis.services.recorder import RecorderConfig, RecorderService
 from ignis.options import options
 from ..constants import WindowName
 from ..useroptions import user_options
+from ..utils import format_metrics, frame_scheduler, lazy_windows
 
 
 cm = CommandManager.get_default()
-wm = WindowManager.get_default()
 recorder = RecorderService.get_default()
 
 
 def toggle_window(window_name: WindowName):
     try:
-        wm.toggle_window(window_name.value)
+        lazy_windows.toggle(window_name)
     except WindowNotFoundError:
         pass
 
 
 def open_window(window_name: WindowName):
     try:
-        wm.open_window(window_name.value)
+        lazy_windows.open(window_name)
     except WindowNotFoundError:
         pass
 
@@ -83,3 +82,18 @@ def toggle_recording(*_):
             stop_recording()
     else:
         start_recording()
+
+
+@cm.command(name="frame-scheduler-stats")
+def frame_scheduler_stats(*_) -> str:
+    lines = [
+        f"{name}: requested {requested}, executed {executed}"
+        for name, (requested, executed) in sorted(frame_scheduler.stats().items())
+    ]
+    lines.append(f"saved: {frame_scheduler.saved} of {frame_scheduler.requested} update(s)")
+    return "\n".join(lines)
+
+
+@cm.command(name="metrics")
+def metrics(*_) -> str:
+    return format_metrics()
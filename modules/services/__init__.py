@@ -1,5 +1,34 @@
+from .applications import AppEntry, AppSnapshotService
 from .cpu import CpuLoadService
 from .fcitx import FcitxStateService
 from .keyboard import KeyboardLedsService
+from .launches import LaunchHistoryService
+from .notifications import (
+    NotificationGroup,
+    NotificationGroupList,
+    NotificationImageCache,
+    get_image_filename,
+)
+from .windows import (
+    WindowFocusHistory,
+    WindowIndexDelta,
+    WindowIndexService,
+    WindowInfo,
+)
 
-__all__ = [CpuLoadService, FcitxStateService, KeyboardLedsService]
+__all__ = [
+    AppEntry,
+    AppSnapshotService,
+    CpuLoadService,
+    FcitxStateService,
+    KeyboardLedsService,
+    LaunchHistoryService,
+    NotificationGroup,
+    NotificationGroupList,
+    NotificationImageCache,
+    WindowFocusHistory,
+    WindowIndexDelta,
+    WindowIndexService,
+    WindowInfo,
+    get_image_filename,
+]
@@ -0,0 +1,261 @@
+import json
+import os
+from os import path
+from typing import Any
+
+from gi.repository import GLib
+from ignis import CACHE_DIR
+from ignis.base_service import BaseService
+from ignis.gobject import IgnisGObject, IgnisSignal
+from ignis.services.applications import Application, ApplicationsService
+from ignis.utils import Timeout
+from loguru import logger
+
+from ..utils import GProperty, get_app_icon_name, invalidate_app_cache, weak_connect
+
+
+class AppEntry(IgnisGObject):
+    """
+    Fields of an application displayed by the launcher and the dock.
+    Entries are restored from the snapshot before ``ApplicationsService`` is loaded,
+    and are updated in place afterwards, so they are stable across reloads.
+    """
+
+    def __init__(self, id: str):
+        super().__init__()
+
+        self._id = id
+        self._name: str = ""
+        self._description: str = ""
+        self._icon_name: str = ""
+        self._exec_string: str = ""
+        self._executable: str = ""
+        self._generic_name: str = ""
+        self._keywords: list[str] = []
+        self._categories: str = ""
+        self._is_pinned: bool = False
+        self._app: Application | None = None
+
+    @GProperty
+    def id(self) -> str:
+        return self._id
+
+    @GProperty
+    def name(self) -> str:
+        return self._name
+
+    @GProperty
+    def description(self) -> str:
+        return self._description
+
+    @GProperty
+    def icon_name(self) -> str:
+        """
+        Icon name resolved by ``get_app_icon_name``.
+        """
+        return self._icon_name
+
+    @GProperty
+    def exec_string(self) -> str:
+        return self._exec_string
+
+    @GProperty
+    def executable(self) -> str:
+        return self._executable
+
+    @GProperty
+    def generic_name(self) -> str:
+        return self._generic_name
+
+    @GProperty
+    def keywords(self) -> list[str]:
+        return self._keywords
+
+    @GProperty
+    def categories(self) -> str:
+        """
+        Semicolon separated categories.
+        """
+        return self._categories
+
+    @GProperty
+    def is_pinned(self) -> bool:
+        return self._is_pinned
+
+    @GProperty
+    def app(self) -> Application | None:
+        """
+        The application, ``None`` until ``ApplicationsService`` is loaded.
+        """
+        return self._app
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self._id,
+            "name": self._name,
+            "description": self._description,
+            "icon_name": self._icon_name,
+            "exec_string": self._exec_string,
+            "executable": self._executable,
+            "generic_name": self._generic_name,
+            "keywords": self._keywords,
+            "categories": self._categories,
+            "is_pinned": self._is_pinned,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "AppEntry | None":
+        entry = cls(data.get("id", ""))
+        if not entry._id or not entry.__assign(data):
+            return None
+        return entry
+
+    def update(self, app: Application) -> bool:
+        """
+        Syncs fields from ``app``, and returns whether any of them is changed.
+        """
+        self._app = app
+        app_info = app.app
+        return self.__assign(
+            {
+                "name": app.name or "",
+                "description": app.description or "",
+                "icon_name": get_app_icon_name(app_info=app),
+                "exec_string": app.exec_string or "",
+                "executable": app.executable or "",
+                "generic_name": app_info.get_generic_name() or "",
+                "keywords": list(app.keywords),
+                "categories": app_info.get_categories() or "",
+                "is_pinned": app.is_pinned,
+            }
+        )
+
+    def __assign(self, data: dict[str, Any]) -> bool:
+        changed: list[str] = []
+        for key, value in data.items():
+            attr = f"_{key}"
+            if key == "id" or not hasattr(self, attr):
+                continue
+            if getattr(self, attr) != value:
+                setattr(self, attr, value)
+                changed.append(key)
+
+        for key in changed:
+            self.notify(key.replace("_", "-"))
+        return len(changed) > 0
+
+
+class AppSnapshotService(BaseService):
+    """
+    Serves ``AppEntry`` for all applications from a snapshot at ``CACHE_DIR/apps-snapshot.json``,
+    so that the launcher and the dock paint before ``ApplicationsService`` parses every desktop file.
+
+    ``ApplicationsService`` is loaded on idle, and entries are reconciled with it then,
+    and whenever it reloads the applications (e.g. when desktop file directories change) or pinned apps change.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        self.__filename = path.join(CACHE_DIR, "apps-snapshot.json")
+        self.__service: ApplicationsService | None = None
+        self.__save_timeout: Timeout | None = None
+        self._entries: dict[str, AppEntry] = self.__load()
+
+        GLib.idle_add(self.__load_service, priority=GLib.PRIORITY_LOW)
+
+    @IgnisSignal
+    def changed(self):
+        """
+        Emitted when entries are added, removed or updated.
+        """
+        return
+
+    @GProperty
+    def entries(self) -> list[AppEntry]:
+        return list(self._entries.values())
+
+    @GProperty
+    def is_loaded(self) -> bool:
+        """
+        Whether entries are reconciled with ``ApplicationsService``.
+        """
+        return self.__service is not None
+
+    def get_entry(self, app_id: str) -> AppEntry | None:
+        return self._entries.get(app_id)
+
+    def get_application(self, entry: AppEntry) -> Application | None:
+        """
+        Returns the application of ``entry``, loading ``ApplicationsService`` now if it is not yet loaded.
+        """
+        self.__load_service()
+        return entry.app
+
+    def __load_service(self) -> bool:
+        if self.__service is None:
+            self.__service = ApplicationsService.get_default()
+            weak_connect(self.__service, "notify::apps", self.__on_apps_changed)
+            weak_connect(self.__service, "notify::pinned", self.__sync)
+            self.__sync()
+            self.notify("is-loaded")
+        return GLib.SOURCE_REMOVE
+
+    def __on_apps_changed(self, *_):
+        # icons may come and go along with applications
+        invalidate_app_cache()
+        self.__sync()
+
+    def __sync(self, *_):
+        if not self.__service:
+            return
+
+        changed = False
+        entries: dict[str, AppEntry] = {}
+        for app in self.__service.apps:
+            if not app.id or app.id in entries:
+                continue
+            entry = self._entries.get(app.id)
+            if entry is None:
+                entry = AppEntry(app.id)
+                changed = True
+            changed = entry.update(app) or changed
+            entries[app.id] = entry
+
+        if list(entries) != list(self._entries):
+            changed = True
+        self._entries = entries
+
+        if changed:
+            self.notify("entries")
+            self.emit("changed")
+            self.__schedule_save()
+
+    def __load(self) -> dict[str, AppEntry]:
+        try:
+            with open(self.__filename) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        entries: dict[str, AppEntry] = {}
+        for item in data if isinstance(data, list) else []:
+            entry = AppEntry.from_dict(item) if isinstance(item, dict) else None
+            if entry:
+                entries[entry.id] = entry
+        return entries
+
+    def __schedule_save(self):
+        if self.__save_timeout is None:
+            self.__save_timeout = Timeout(ms=1000, target=self.__save)
+
+    def __save(self, *_):
+        self.__save_timeout = None
+        try:
+            os.makedirs(path.dirname(self.__filename), exist_ok=True)
+            tmp_filename = self.__filename + ".tmp"
+            with open(tmp_filename, "w") as f:
+                json.dump([entry.to_dict() for entry in self._entries.values()], f)
+            os.replace(tmp_filename, self.__filename)
+        except OSError as e:
+            logger.warning(f"failed to save applications snapshot: {e}")
@@ -0,0 +1,138 @@
+import math
+import os
+import time
+from os import path
+
+from ignis import DATA_DIR
+from ignis.base_service import BaseService
+from ignis.gobject import IgnisSignal
+from loguru import logger
+
+
+class LaunchHistoryService(BaseService):
+    """
+    Keeps per-app launch counts and frecency ranks in an append-only log at ``DATA_DIR/launch_history.log``.
+
+    Every launch contributes ``2 ** (-age / half_life)`` to the frecency score of an app.
+    The score is stored as a rank ``log(sum(exp(t / tau)))`` over launch timestamps ``t``,
+    which orders apps the same as the score at any moment, so it never needs to be recomputed as time passes.
+
+    Log lines are either a launch ``L <timestamp> <app_id>``, or a compacted summary ``S <count> <rank> <app_id>``,
+    separated by tabs. The log is compacted into summaries when it grows much longer than the number of apps.
+    """
+
+    half_life: float = 14 * 24 * 3600
+    """Seconds for a launch to lose half of its weight."""
+
+    def __init__(self, filename: str | None = None):
+        super().__init__()
+
+        self.__filename = filename or path.join(DATA_DIR, "launch_history.log")
+        self.__tau = self.half_life / math.log(2)
+        self.__counts: dict[str, int] = {}
+        self.__ranks: dict[str, float] = {}
+        self.__lines: int = 0
+
+        self.__load()
+        if self.__should_compact():
+            self.__compact()
+
+    @IgnisSignal
+    def changed(self, app_id: str):
+        """
+        Emitted with the app id after a launch is recorded.
+        """
+        return
+
+    def get_count(self, app_id: str | None) -> int:
+        return self.__counts.get(app_id or "", 0)
+
+    def get_rank(self, app_id: str | None) -> float:
+        """
+        Returns the frecency rank of the app, ``-inf`` if it has never been launched. Higher is more frecent.
+        """
+        return self.__ranks.get(app_id or "", -math.inf)
+
+    def get_score(self, app_id: str | None, now: float | None = None) -> float:
+        """
+        Returns the frecency score, the sum of decayed weights of all launches at ``now``.
+        """
+        rank = self.get_rank(app_id)
+        return math.exp(rank - (now or time.time()) / self.__tau) if rank > -math.inf else 0.0
+
+    def get_scores(self, now: float | None = None) -> dict[str, float]:
+        """
+        Returns frecency scores of all launched apps at ``now``, see ``get_score``.
+        """
+        offset = (now or time.time()) / self.__tau
+        return {app_id: math.exp(rank - offset) for app_id, rank in self.__ranks.items()}
+
+    def record(self, app_id: str | None, timestamp: float | None = None):
+        """
+        Records a launch of ``app_id``.
+        """
+        if not app_id or "\t" in app_id or "\n" in app_id:
+            return
+
+        timestamp = timestamp or time.time()
+        self.__add(app_id, 1, timestamp / self.__tau)
+        try:
+            self.__append(f"L\t{timestamp:.0f}\t{app_id}\n")
+        except OSError as e:
+            logger.warning(f"failed to record launch history: {e}")
+
+        if self.__should_compact():
+            self.__compact()
+        self.emit("changed", app_id)
+
+    def __add(self, app_id: str, count: int, rank: float):
+        self.__counts[app_id] = self.__counts.get(app_id, 0) + count
+        prev = self.__ranks.get(app_id)
+        if prev is None:
+            self.__ranks[app_id] = rank
+        else:
+            # log(exp(prev) + exp(rank)), without overflow
+            high, low = max(prev, rank), min(prev, rank)
+            self.__ranks[app_id] = high + math.log1p(math.exp(low - high))
+
+    def __load(self):
+        try:
+            with open(self.__filename) as f:
+                lines = f.readlines()
+        except OSError:
+            return
+
+        for line in lines:
+            fields = line.rstrip("\n").split("\t")
+            try:
+                match fields:
+                    case ["L", timestamp, app_id]:
+                        self.__add(app_id, 1, float(timestamp) / self.__tau)
+                    case ["S", count, rank, app_id]:
+                        self.__add(app_id, int(count), float(rank))
+                    case _:
+                        continue
+            except ValueError:
+                continue
+            self.__lines += 1
+
+    def __append(self, line: str):
+        os.makedirs(path.dirname(self.__filename), exist_ok=True)
+        with open(self.__filename, "a") as f:
+            f.write(line)
+        self.__lines += 1
+
+    def __should_compact(self) -> bool:
+        return self.__lines > 2 * len(self.__counts) + 64
+
+    def __compact(self):
+        tmp_filename = self.__filename + ".tmp"
+        try:
+            os.makedirs(path.dirname(self.__filename), exist_ok=True)
+            with open(tmp_filename, "w") as f:
+                for app_id, count in self.__counts.items():
+                    f.write(f"S\t{count}\t{self.__ranks[app_id]!r}\t{app_id}\n")
+            os.replace(tmp_filename, self.__filename)
+            self.__lines = len(self.__counts)
+        except OSError as e:
+            logger.warning(f"failed to compact launch history: {e}")
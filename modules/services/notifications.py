@@ -0,0 +1,425 @@
+import hashlib
+import os
+import time
+import urllib.parse
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from os import path
+from typing import Any
+
+from gi.repository import Gdk, GdkPixbuf, Gio, GLib
+from ignis import CACHE_DIR
+from ignis.base_service import BaseService
+from ignis.gobject import IgnisGObject
+from ignis.services.notifications import (
+    NOTIFICATIONS_IMAGE_DATA,
+    Notification,
+    NotificationService,
+)
+from ignis.utils import Timeout
+from loguru import logger
+
+from ..utils import (
+    GProperty,
+    PositionIndex,
+    counter_metric,
+    latency_metric,
+    weak_connect,
+)
+
+_coalesced = counter_metric("notifications.coalesced")
+_replaced = counter_metric("notifications.replaced")
+_image_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="notification-images")
+_image_hits = counter_metric("notifications.images.hit")
+_image_misses = counter_metric("notifications.images.miss")
+_image_evicted = counter_metric("notifications.images.evicted")
+_image_latency = latency_metric("notifications.images.load")
+
+
+def _notify_key(notify: Notification) -> tuple[int, float]:
+    return notify.id, notify.time
+
+
+class NotificationGroup(IgnisGObject):
+    """
+    Notifications of an app received in a burst, newest first.
+    """
+
+    def __init__(self, app_name: str):
+        super().__init__()
+
+        self._app_name = app_name
+        self._notifications = Gio.ListStore()
+        self._expanded: bool = False
+        self.__index = PositionIndex[tuple[int, float]]()
+
+    @GProperty
+    def app_name(self) -> str:
+        return self._app_name
+
+    @GProperty
+    def notifications(self) -> Gio.ListStore:
+        return self._notifications
+
+    @GProperty
+    def latest(self) -> Notification | None:
+        return self._notifications.get_item(0)  # type: ignore
+
+    @GProperty
+    def count(self) -> int:
+        return self._notifications.get_n_items()
+
+    @GProperty
+    def expanded(self) -> bool:
+        """
+        Whether earlier notifications are shown, kept here as the view's row is recreated when the group is moved.
+        """
+        return self._expanded
+
+    @expanded.setter
+    def expanded(self, expanded: bool):
+        self._expanded = expanded
+
+    def prepend(self, notify: Notification):
+        self.__index.prepend(_notify_key(notify))
+        self._notifications.insert(0, notify)
+        self.notify("latest")
+        self.notify("count")
+
+    def remove(self, notify: Notification) -> bool:
+        pos = self.__index.remove(_notify_key(notify))
+        if pos is None:
+            return False
+
+        self._notifications.remove(pos)
+        if pos == 0:
+            self.notify("latest")
+        self.notify("count")
+        return True
+
+
+class NotificationGroupList(IgnisGObject):
+    """
+    Groups notifications by app name, so that a burst of notifications from one app is a single expandable row.
+
+    A notification joins the newest group of its app if it arrives within ``coalesce_window`` seconds
+    after the latest one of the group, and the group is moved to the front. Otherwise it starts a new group.
+    A notification with the id of a previous one (i.e. ``replaces_id``) replaces it.
+
+    Groups are kept in ``groups``, newest first.
+    """
+
+    coalesce_window: float = 5
+
+    def __init__(self):
+        super().__init__()
+
+        self._groups = Gio.ListStore()
+        self.__index = PositionIndex[NotificationGroup]()
+        self.__by_key: dict[tuple[int, float], NotificationGroup] = {}
+        self.__by_id: dict[int, Notification] = {}
+        self.__newest: dict[str, NotificationGroup] = {}
+        """The newest group of each app."""
+
+    @GProperty
+    def groups(self) -> Gio.ListStore:
+        return self._groups
+
+    def get_group(self, notify: Notification) -> NotificationGroup | None:
+        return self.__by_key.get(_notify_key(notify))
+
+    def add(self, notify: Notification) -> NotificationGroup:
+        """
+        Adds ``notify`` and returns its group, which is new if it has only ``notify``.
+        """
+        group = self.get_group(notify)
+        if group:
+            return group
+
+        replaced = self.__by_id.get(notify.id)
+        if replaced:
+            _replaced.inc()
+            self.remove(replaced)
+
+        app_name = notify.app_name or ""
+        group = self.__newest.get(app_name)
+        latest = group and group.latest
+        if group and latest and notify.time - latest.time <= self.coalesce_window:
+            _coalesced.inc()
+            pos = self.__index.remove(group)
+            if pos:
+                self._groups.remove(pos)
+                self._groups.insert(0, group)
+        else:
+            group = self.__newest[app_name] = NotificationGroup(app_name)
+            self._groups.insert(0, group)
+        self.__index.prepend(group)
+
+        group.prepend(notify)
+        self.__by_key[_notify_key(notify)] = group
+        self.__by_id[notify.id] = notify
+        return group
+
+    def remove(self, notify: Notification) -> bool:
+        group = self.__by_key.pop(_notify_key(notify), None)
+        if not group:
+            return False
+
+        if self.__by_id.get(notify.id) is notify:
+            del self.__by_id[notify.id]
+
+        group.remove(notify)
+        if group.count == 0:
+            pos = self.__index.remove(group)
+            if pos is not None:
+                self._groups.remove(pos)
+            if self.__newest.get(group.app_name) is group:
+                del self.__newest[group.app_name]
+        return True
+
+    def clear(self):
+        """
+        Removes all groups in a single splice.
+        """
+        self.__index.clear()
+        self.__by_key.clear()
+        self.__by_id.clear()
+        self.__newest.clear()
+        self._groups.splice(0, self._groups.get_n_items(), [])
+
+
+def get_image_filename(icon: str | None) -> str | None:
+    """
+    Returns the file of a notification icon, ``None`` if it is an icon name.
+    """
+    if icon and icon.startswith("file://"):
+        return urllib.parse.unquote(icon).removeprefix("file://")
+    if icon and path.isabs(icon):
+        return icon
+    return None
+
+
+def _thumbnail_filename(cache_dir: str, digest: str, size: int) -> str:
+    return path.join(cache_dir, f"{digest}-{size}.png")
+
+
+def _pixbuf_texture(pixbuf: GdkPixbuf.Pixbuf) -> Gdk.Texture:
+    memory_format = Gdk.MemoryFormat.R8G8B8A8 if pixbuf.get_has_alpha() else Gdk.MemoryFormat.R8G8B8
+    return Gdk.MemoryTexture.new(
+        pixbuf.get_width(), pixbuf.get_height(), memory_format, pixbuf.read_pixel_bytes(), pixbuf.get_rowstride()
+    )
+
+
+def _load_thumbnail(filename: str, size: int, cache_dir: str) -> tuple[str, tuple[int, int], Gdk.Texture]:
+    """
+    Runs on the worker thread, returns the digest of ``filename``, its ``(mtime, size)`` when it is read,
+    and the texture of its thumbnail, which fits in ``size`` pixels.
+    """
+    with open(filename, "rb") as f:
+        stat = os.fstat(f.fileno())
+        data = f.read()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    thumbnail = _thumbnail_filename(cache_dir, digest, size)
+    if path.exists(thumbnail):
+        # mtime orders thumbnails for eviction
+        os.utime(thumbnail)
+        return digest, stamp, _pixbuf_texture(GdkPixbuf.Pixbuf.new_from_file(thumbnail))
+
+    def on_size_prepared(loader: GdkPixbuf.PixbufLoader, width: int, height: int):
+        scale = min(1, size / max(width, height, 1))
+        loader.set_size(max(1, round(width * scale)), max(1, round(height * scale)))
+
+    # decode at the target size, instead of the full resolution
+    loader = GdkPixbuf.PixbufLoader()
+    loader.connect("size-prepared", on_size_prepared)
+    loader.write(data)
+    loader.close()
+    pixbuf = loader.get_pixbuf()
+    if pixbuf is None:
+        raise ValueError("no image decoded")
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_filename = thumbnail + ".tmp"
+    pixbuf.savev(tmp_filename, "png", [], [])
+    os.replace(tmp_filename, thumbnail)
+    return digest, stamp, _pixbuf_texture(pixbuf)
+
+
+def _evict_thumbnails(cache_dir: str, max_bytes: int, referenced: set[str], min_age: float) -> int:
+    """
+    Runs on the worker thread, removes the least recently used thumbnails beyond ``max_bytes``,
+    and image data of closed notifications. Returns the number of removed thumbnails.
+    """
+    entries: list[tuple[float, int, str]] = []
+    if path.isdir(cache_dir):
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    evicted = 0
+    total = sum(size for _, size, _ in entries)
+    for _, size, filename in sorted(entries):
+        if total <= max_bytes:
+            break
+        os.remove(filename)
+        total -= size
+        evicted += 1
+
+    # image data saved by NotificationService, skipping recent ones which may belong to new notifications
+    if path.isdir(NOTIFICATIONS_IMAGE_DATA):
+        deadline = time.time() - min_age
+        with os.scandir(NOTIFICATIONS_IMAGE_DATA) as it:
+            for entry in it:
+                if entry.is_file() and entry.path not in referenced and entry.stat().st_mtime < deadline:
+                    os.remove(entry.path)
+    return evicted
+
+
+class NotificationImageCache(BaseService):
+    """
+    Loads images of notifications as textures of the displayed size.
+
+    Images are decoded and downscaled into textures on a worker thread, and thumbnails are stored once per content
+    at ``CACHE_DIR/notification-images/<digest>-<size>.png``, so a recurring avatar is decoded only once.
+    A loaded texture is reused as long as the mtime and size of its file are unchanged.
+    Thumbnails beyond ``max_bytes`` are evicted in the least recently used order on the worker thread,
+    along with image data of notifications which are closed, after a load or a notification is closed.
+    """
+
+    max_bytes: int = 32 * 1024 * 1024
+    max_textures: int = 128
+    """Textures kept in memory."""
+
+    def __init__(self):
+        super().__init__()
+
+        self.__cache_dir = path.join(CACHE_DIR, "notification-images")
+        self.__digests: OrderedDict[tuple[str, int], tuple[str, tuple[int, int]]] = OrderedDict()
+        """Maps ``(filename, size)`` to the digest of the image content, and ``(mtime, size)`` of the file read."""
+        self.__textures: OrderedDict[tuple[str, int], Gdk.Texture] = OrderedDict()
+        """Maps ``(digest, size)`` to textures, least recently used first."""
+        self.__pending: dict[tuple[str, int], list[Callable[[Gdk.Texture | None], Any]]] = {}
+        self.__evict_timeout: Timeout | None = None
+        self.__touched: set[str] = set()
+        """Thumbnails of textures used since the last eviction, whose mtime is updated before evicting."""
+
+        self.__service = NotificationService.get_default()
+        weak_connect(self.__service, "notified", self.__on_notified)
+        for notify in self.__service.notifications:
+            self.__on_notified(self.__service, notify)
+
+    def lookup(self, filename: str, size: int) -> Gdk.Texture | None:
+        """
+        Returns the texture of ``filename`` if it is already loaded, and the file is not modified since.
+        """
+        cached = self.__digests.get((filename, size))
+        texture = cached and self.__textures.get((cached[0], size))
+        if not cached or not texture:
+            return None
+
+        digest, stamp = cached
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        if (stat.st_mtime_ns, stat.st_size) != stamp:
+            # rewritten in place, e.g. cover art of the next track, or image data of a replacing notification
+            del self.__digests[(filename, size)]
+            return None
+
+        self.__textures.move_to_end((digest, size))
+        self.__touched.add(_thumbnail_filename(self.__cache_dir, digest, size))
+        self.__schedule_evict()
+        _image_hits.inc()
+        return texture
+
+    def load(self, filename: str, size: int, callback: Callable[[Gdk.Texture | None], Any]):
+        """
+        Loads ``filename`` fitting in ``size`` pixels, and calls ``callback`` with the texture,
+        or ``None`` if it fails, on the main thread.
+        """
+        texture = self.lookup(filename, size)
+        if texture:
+            callback(texture)
+            return
+
+        key = (filename, size)
+        callbacks = self.__pending.get(key)
+        if callbacks is not None:
+            callbacks.append(callback)
+            return
+
+        _image_misses.inc()
+        self.__pending[key] = [callback]
+        begin = time.perf_counter_ns()
+
+        def load():
+            try:
+                loaded = _load_thumbnail(filename, size, self.__cache_dir)
+            except (OSError, ValueError, GLib.Error) as e:
+                logger.debug(f"failed to load notification image {filename}: {e}")
+                loaded = None
+            GLib.idle_add(self.__on_loaded, key, loaded, begin)
+
+        _image_executor.submit(load)
+
+    def __on_loaded(
+        self, key: tuple[str, int], loaded: tuple[str, tuple[int, int], Gdk.Texture] | None, begin: int
+    ) -> bool:
+        texture: Gdk.Texture | None = None
+        if loaded:
+            digest, stamp, texture = loaded
+            size = key[1]
+            # share the texture with other files of the same content
+            texture = self.__textures.get((digest, size)) or texture
+            self.__remember(self.__digests, key, (digest, stamp), self.max_textures * 8)
+            self.__remember(self.__textures, (digest, size), texture, self.max_textures)
+            self.__schedule_evict()
+        _image_latency.record_since(begin)
+
+        for callback in self.__pending.pop(key, []):
+            callback(texture)
+        return GLib.SOURCE_REMOVE
+
+    @staticmethod
+    def __remember[K, V](cache: OrderedDict[K, V], key: K, value: V, limit: int):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > max(limit, 1):
+            cache.popitem(last=False)
+
+    def __on_notified(self, _, notify: Notification):
+        weak_connect(notify, "closed", self.__on_closed)
+
+    def __on_closed(self, *_):
+        self.__schedule_evict()
+
+    def __schedule_evict(self):
+        if self.__evict_timeout is None:
+            self.__evict_timeout = Timeout(ms=5000, target=self.__evict)
+
+    def __evict(self, *_):
+        self.__evict_timeout = None
+        touched, self.__touched = self.__touched, set()
+        referenced: set[str] = set()
+        for notify in self.__service.notifications:
+            filename = get_image_filename(notify.icon)
+            if filename:
+                referenced.add(filename)
+
+        def evict():
+            for thumbnail in touched:
+                try:
+                    os.utime(thumbnail)
+                except OSError:
+                    continue
+            try:
+                _image_evicted.inc(_evict_thumbnails(self.__cache_dir, self.max_bytes, referenced, 60))
+            except OSError as e:
+                logger.warning(f"failed to evict notification images: {e}")
+
+        _image_executor.submit(evict)
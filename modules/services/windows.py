@@ -0,0 +1,409 @@
+import dataclasses
+import json
+import os
+from collections import OrderedDict
+from collections.abc import Iterable
+from os import path
+
+from ignis import DATA_DIR
+from ignis.base_service import BaseService
+from ignis.gobject import IgnisSignal
+from ignis.services.hyprland import HyprlandService, HyprlandWindow
+from ignis.services.niri import NiriService, NiriWindow
+from ignis.utils import Timeout
+from ignis.variable import Variable
+from loguru import logger
+
+from ..utils import GProperty, hypr_command, niri_action, weak_connect
+
+
+class WindowInfo:
+    """
+    A wrapper to unify queries on ``NiriWindow`` and ``HyprlandWindow``.
+    """
+
+    def __init__(self, window: NiriWindow | HyprlandWindow):
+        self.window = window
+
+        self.id = 0
+        self.pid = 0
+        self.app_id = ""
+        self.workspace_id = 0
+        self.title = ""
+        self.output = ""
+        """Connector of the monitor the window is on, maintained by ``WindowIndexService``."""
+
+        self.update(window)
+
+    def update(self, window: NiriWindow | HyprlandWindow) -> bool:
+        """
+        Syncs fields from ``window``, and returns whether any of them is changed.
+        """
+        self.window = window
+        if isinstance(window, NiriWindow):
+            fields = (window.id, window.pid, window.app_id, window.workspace_id, window.title)
+        else:
+            fields = (window.pid, window.pid, window.class_name, window.workspace_id, window.title)
+
+        if fields == (self.id, self.pid, self.app_id, self.workspace_id, self.title):
+            return False
+
+        self.id, self.pid, self.app_id, self.workspace_id, self.title = fields
+        return True
+
+    def focus(self):
+        if isinstance(self.window, NiriWindow):
+            self.window.focus()
+        elif isinstance(self.window, HyprlandWindow):
+            hypr_command(f"dispatch focuswindow pid:{self.window.pid}")
+            hypr_command("dispatch alterzorder top")
+
+    def maximize(self):
+        self.focus()
+        if isinstance(self.window, NiriWindow):
+            if not self.window.is_floating:
+                niri_action("MaximizeColumn")
+        elif isinstance(self.window, HyprlandWindow):
+            hypr_command("dispatch fullscreen 1")
+
+    def fullscreen(self):
+        self.focus()
+        if isinstance(self.window, NiriWindow):
+            niri_action("FullscreenWindow", {"id": self.window.id})
+        elif isinstance(self.window, HyprlandWindow):
+            hypr_command("dispatch fullscreen 0")
+
+    def toggle_floating(self):
+        self.focus()
+        if isinstance(self.window, NiriWindow):
+            niri_action("ToggleWindowFloating", {"id": self.window.id})
+        elif isinstance(self.window, HyprlandWindow):
+            hypr_command(f"dispatch togglefloating pid:{self.window.pid}")
+
+    def close(self):
+        if isinstance(self.window, NiriWindow):
+            niri_action("CloseWindow", {"id": self.window.id})
+        elif isinstance(self.window, HyprlandWindow):
+            hypr_command(f"dispatch closewindow pid:{self.window.pid}")
+
+
+class WindowFocusHistory:
+    """
+    Most-recently-used order of window ids.
+    Focusing and removing a window are O(1), and ``find_latest_index`` is linear in the queried windows only.
+    The order is snapshotted to ``filename`` shortly after changes, and restored on start.
+    """
+
+    def __init__(self, filename: str, save_delay: int = 1000):
+        self.__filename = filename
+        self.__save_delay = save_delay
+        self.__save_timeout: Timeout | None = None
+        self.__sequence: int = 0
+        self.__order: OrderedDict[int, int] = OrderedDict()
+        """Maps window ids to focus sequences, the most recent one last."""
+
+        self.__load()
+
+    def get_focus_hist(self, window_id: int) -> int:
+        """
+        Queries the focus sequence of the window, ``0`` if it has never been focused.
+        """
+        return self.__order.get(window_id, 0)
+
+    def focus_window(self, window_id: int):
+        """
+        Moves the window to the most recent position.
+        """
+        if self.__order and next(reversed(self.__order)) == window_id:
+            return
+
+        self.__sequence += 1
+        self.__order[window_id] = self.__sequence
+        self.__order.move_to_end(window_id)
+        self.__schedule_save()
+
+    def remove_window(self, window_id: int):
+        if self.__order.pop(window_id, None) is not None:
+            self.__schedule_save()
+
+    def prune(self, window_ids: Iterable[int]):
+        """
+        Drops windows not in ``window_ids``.
+        """
+        alive = set(window_ids)
+        for window_id in [id for id in self.__order if id not in alive]:
+            self.remove_window(window_id)
+
+    def find_latest_index(self, windows: list["WindowInfo"] | None = None) -> int:
+        """
+        Finds the index of the latest focused window in ``windows``.
+        Returns ``-1`` if none of them has been focused.
+        """
+        idx = -1
+        latest = 0
+        for i, win in enumerate(windows or []):
+            hist = self.__order.get(win.id, 0)
+            if hist > latest:
+                idx, latest = i, hist
+        return idx
+
+    def __load(self):
+        try:
+            with open(self.__filename) as f:
+                window_ids = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(window_ids, list):
+            return
+
+        for window_id in window_ids:
+            if isinstance(window_id, int):
+                self.__sequence += 1
+                self.__order[window_id] = self.__sequence
+                self.__order.move_to_end(window_id)
+
+    def __schedule_save(self):
+        if self.__save_timeout is None:
+            self.__save_timeout = Timeout(ms=self.__save_delay, target=self.__save)
+
+    def __save(self, *_):
+        self.__save_timeout = None
+        try:
+            os.makedirs(path.dirname(self.__filename), exist_ok=True)
+            tmp_filename = self.__filename + ".tmp"
+            with open(tmp_filename, "w") as f:
+                json.dump(list(self.__order), f)
+            os.replace(tmp_filename, self.__filename)
+        except OSError as e:
+            logger.warning(f"failed to save window focus history: {e}")
+
+
+@dataclasses.dataclass
+class WindowIndexDelta:
+    """
+    Changes emitted by ``WindowIndexService`` in one update.
+    """
+
+    added: set[int] = dataclasses.field(default_factory=set)
+    removed: set[int] = dataclasses.field(default_factory=set)
+    changed: set[int] = dataclasses.field(default_factory=set)
+    """Windows whose title, app id, or workspace is changed."""
+    outputs: set[str] = dataclasses.field(default_factory=set)
+    """Outputs affected by the changes above, or by focus changes."""
+    focus_changed: bool = False
+    workspaces_changed: bool = False
+    """Whether workspaces are moved between outputs, or activated."""
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed or self.focus_changed or self.workspaces_changed)
+
+
+class WindowIndexService(BaseService):
+    """
+    Owns a ``WindowInfo`` per compositor window, keyed by window id,
+    and keeps windows indexed by output, workspace and app id incrementally.
+    Emits ``changed`` with a ``WindowIndexDelta`` wrapped in a ``Variable`` on every update.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        self.__niri = NiriService.get_default()
+        self.__hypr = HyprlandService.get_default()
+
+        self._windows: dict[int, WindowInfo] = {}
+        self._by_output: dict[str, dict[int, WindowInfo]] = {}
+        self._by_workspace: dict[int, dict[int, WindowInfo]] = {}
+        self._by_app_id: dict[str, dict[int, WindowInfo]] = {}
+        self._workspace_outputs: dict[int, str] = {}
+        self._active_workspaces: set[int] = set()
+        self._active_window_id: int = 0
+        self._focus_history = WindowFocusHistory(path.join(DATA_DIR, "window_focus_history.json"))
+
+        if self.__niri.is_available:
+            weak_connect(self.__niri, "notify::workspaces", self.__on_workspaces_changed)
+            weak_connect(self.__niri, "notify::windows", self.__on_windows_changed)
+            weak_connect(self.__niri, "notify::active-window", self.__on_active_window_changed)
+        if self.__hypr.is_available:
+            weak_connect(self.__hypr, "notify::workspaces", self.__on_workspaces_changed)
+            weak_connect(self.__hypr, "notify::windows", self.__on_windows_changed)
+            weak_connect(self.__hypr, "notify::active-window", self.__on_active_window_changed)
+            for monitor in self.__hypr.monitors:
+                weak_connect(monitor, "notify::active-workspace-id", self.__on_workspaces_changed)
+
+        delta = WindowIndexDelta()
+        self.__sync_workspaces(delta)
+        self.__sync_windows(delta)
+        if self._windows:
+            # windows closed while the shell is not running
+            self._focus_history.prune(self._windows)
+        self.__sync_active_window(delta)
+
+    @IgnisSignal
+    def changed(self, delta: Variable):
+        """
+        Emitted with a ``Variable`` whose value is a ``WindowIndexDelta``.
+        """
+        return
+
+    @GProperty
+    def windows(self) -> list[WindowInfo]:
+        return list(self._windows.values())
+
+    @GProperty
+    def active_window_id(self) -> int:
+        return self._active_window_id
+
+    @GProperty
+    def focus_history(self) -> WindowFocusHistory:
+        return self._focus_history
+
+    @GProperty
+    def active_workspaces(self) -> set[int]:
+        """
+        Ids of focused workspaces in any monitors.
+        """
+        return self._active_workspaces
+
+    def get_window(self, window_id: int) -> WindowInfo | None:
+        return self._windows.get(window_id)
+
+    def get_output_workspaces(self, output: str | None) -> set[int]:
+        return {ws for ws, o in self._workspace_outputs.items() if o == output}
+
+    def get_output_windows(self, output: str | None) -> list[WindowInfo]:
+        return list(self._by_output.get(output or "", {}).values())
+
+    def get_workspace_windows(self, workspace_id: int) -> list[WindowInfo]:
+        return list(self._by_workspace.get(workspace_id, {}).values())
+
+    def get_app_windows(self, app_id: str) -> list[WindowInfo]:
+        return list(self._by_app_id.get(app_id, {}).values())
+
+    @classmethod
+    def __index_add[K](cls, index: dict[K, dict[int, WindowInfo]], key: K, info: WindowInfo):
+        index.setdefault(key, {})[info.id] = info
+
+    @classmethod
+    def __index_remove[K](cls, index: dict[K, dict[int, WindowInfo]], key: K, info: WindowInfo):
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(info.id, None)
+            if not bucket:
+                index.pop(key)
+
+    def __add(self, info: WindowInfo):
+        info.output = self._workspace_outputs.get(info.workspace_id, "")
+        self._windows[info.id] = info
+        self.__index_add(self._by_output, info.output, info)
+        self.__index_add(self._by_workspace, info.workspace_id, info)
+        self.__index_add(self._by_app_id, info.app_id, info)
+
+    def __remove(self, info: WindowInfo):
+        self._windows.pop(info.id, None)
+        self.__index_remove(self._by_output, info.output, info)
+        self.__index_remove(self._by_workspace, info.workspace_id, info)
+        self.__index_remove(self._by_app_id, info.app_id, info)
+
+    def __emit(self, delta: WindowIndexDelta):
+        if delta:
+            self.emit("changed", Variable(value=delta))
+
+    def __sync_workspaces(self, delta: WindowIndexDelta):
+        if self.__niri.is_available:
+            outputs = {ws.id: ws.output or "" for ws in self.__niri.workspaces}
+            active = {ws.id for ws in self.__niri.workspaces if ws.is_active}
+        elif self.__hypr.is_available:
+            outputs = {ws.id: ws.monitor or "" for ws in self.__hypr.workspaces}
+            active = {m.active_workspace_id for m in self.__hypr.monitors}
+        else:
+            return
+
+        if outputs == self._workspace_outputs and active == self._active_workspaces:
+            return
+
+        delta.workspaces_changed = True
+        delta.outputs |= {outputs.get(ws, "") for ws in active ^ self._active_workspaces}
+        self._workspace_outputs = outputs
+        self._active_workspaces = active
+
+        # re-index windows moved along with their workspaces
+        for info in list(self._windows.values()):
+            output = outputs.get(info.workspace_id, "")
+            if output != info.output:
+                delta.outputs |= {info.output, output}
+                self.__remove(info)
+                self.__add(info)
+                delta.changed.add(info.id)
+
+    def __sync_windows(self, delta: WindowIndexDelta):
+        if self.__niri.is_available:
+            windows: list[NiriWindow] | list[HyprlandWindow] = self.__niri.windows
+        elif self.__hypr.is_available:
+            windows = self.__hypr.windows
+        else:
+            return
+
+        seen: set[int] = set()
+        for window in windows:
+            window_id = window.id if isinstance(window, NiriWindow) else window.pid
+            seen.add(window_id)
+            info = self._windows.get(window_id)
+            if info is None:
+                info = WindowInfo(window)
+                self.__add(info)
+                delta.added.add(info.id)
+                delta.outputs.add(info.output)
+                continue
+
+            output, workspace_id, app_id = info.output, info.workspace_id, info.app_id
+            if info.update(window):
+                self.__index_remove(self._by_output, output, info)
+                self.__index_remove(self._by_workspace, workspace_id, info)
+                self.__index_remove(self._by_app_id, app_id, info)
+                self.__add(info)
+                delta.changed.add(info.id)
+                delta.outputs |= {output, info.output}
+
+        for window_id in [id for id in self._windows if id not in seen]:
+            info = self._windows[window_id]
+            self.__remove(info)
+            self._focus_history.remove_window(window_id)
+            delta.removed.add(window_id)
+            delta.outputs.add(info.output)
+
+    def __sync_active_window(self, delta: WindowIndexDelta):
+        if self.__niri.is_available:
+            active_id = self.__niri.active_window.id
+        elif self.__hypr.is_available:
+            active_id = self.__hypr.active_window.pid
+        else:
+            return
+
+        if active_id == self._active_window_id:
+            return
+
+        for window_id in [self._active_window_id, active_id]:
+            info = self._windows.get(window_id)
+            if info:
+                delta.outputs.add(info.output)
+        self._active_window_id = active_id
+        if active_id in self._windows:
+            self._focus_history.focus_window(active_id)
+        delta.focus_changed = True
+
+    def __on_workspaces_changed(self, *_):
+        delta = WindowIndexDelta()
+        self.__sync_workspaces(delta)
+        self.__emit(delta)
+
+    def __on_windows_changed(self, *_):
+        delta = WindowIndexDelta()
+        self.__sync_windows(delta)
+        self.__sync_active_window(delta)
+        self.__emit(delta)
+
+    def __on_active_window_changed(self, *_):
+        delta = WindowIndexDelta()
+        self.__sync_active_window(delta)
+        self.__emit(delta)
@@ -40,6 +40,9 @@ class UserOptions(OptionsManager):
     class Osd(OptionsGroup):
         timeout: int = 3000
 
+    class PopupWindows(OptionsGroup):
+        dispose_delay: int = 0
+
     class Topbar(OptionsGroup):
         exclusive: bool = True
         focusable: bool = False
@@ -56,6 +59,7 @@ class UserOptions(OptionsManager):
     fcitx_kimpanel = FcitxKimPanel()
     topbar = Topbar()
     osd = Osd()
+    popup_windows = PopupWindows()
     wallpaper = Wallpaper()
 
 
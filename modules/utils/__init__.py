@@ -1,6 +1,19 @@
-from .desktop import app_icon_overrides, app_id_overrides, get_app_icon_name, get_app_id, launch_application
+from .css import ScssWatcher, compile_scss_cached
+from .desktop import (
+    app_icon_overrides,
+    app_id_overrides,
+    get_app_icon_name,
+    get_app_id,
+    invalidate_app_cache,
+    launch_application,
+    parse_exec,
+)
+from .fuzzy import FuzzyIndex
 from .gesture import set_on_click, set_on_key_pressed, set_on_motion, set_on_scroll
 from .hypr import hypr_command
+from .lazy import LazyWindowRegistry, lazy_windows
+from .listindex import PositionIndex
+from .metrics import CounterMetric, LatencyMetric, counter_metric, format_metrics, latency_metric
 from .misc import (
     b64enc,
     clear_dir,
@@ -13,6 +26,7 @@ from .misc import (
 from .niri import niri_action
 from .options import bind_option, connect_option
 from .pango import escape_pango_markup, verify_pango_markup
+from .scheduler import FrameScheduler, connect_coalesced, frame_scheduler
 from .signal import (
     BindingSpec,
     SignalSpec,
@@ -24,12 +38,26 @@ from .signal import (
     weak_connect_callback,
     weak_connect_method,
 )
-from .template import ensure_ui_file, gtk_template, gtk_template_callback, gtk_template_child
+from .template import (
+    compile_ui_files,
+    ensure_ui_file,
+    gtk_builder,
+    gtk_template,
+    gtk_template_callback,
+    gtk_template_child,
+)
 from .widget import GProperty, connect_window, get_widget_monitor, get_widget_monitor_id
 
 __all__ = [
     BindingSpec,
+    CounterMetric,
+    FrameScheduler,
+    FuzzyIndex,
     GProperty,
+    LatencyMetric,
+    LazyWindowRegistry,
+    PositionIndex,
+    ScssWatcher,
     SignalSpec,
     SpecsBase,
     SpecType,
@@ -40,24 +68,35 @@ __all__ = [
     b64enc,
     bind_option,
     clear_dir,
+    compile_scss_cached,
+    compile_ui_files,
+    connect_coalesced,
     connect_option,
     connect_window,
+    counter_metric,
     dbus_info_file,
     ensure_ui_file,
     escape_pango_markup,
+    format_metrics,
     format_time_duration,
+    frame_scheduler,
     get_app_icon_name,
     get_app_id,
     get_widget_monitor,
     get_widget_monitor_id,
+    gtk_builder,
     gtk_template,
     gtk_template_callback,
     gtk_template_child,
     hypr_command,
+    invalidate_app_cache,
     is_instance_method,
+    latency_metric,
+    lazy_windows,
     unpack_instance_method,
     launch_application,
     niri_action,
+    parse_exec,
     run_cmd_async,
     set_on_click,
     set_on_key_pressed,
@@ -0,0 +1,137 @@
+import hashlib
+import os
+import re
+from os import path
+
+from ignis import CACHE_DIR
+from ignis.css_manager import CssManager
+from ignis.utils import FileMonitor, debounce, sass_compile
+from loguru import logger
+
+from .trace import trace_span
+
+css_cache_path = path.join(CACHE_DIR, "css")
+
+_import_pattern = re.compile(r"""@(?:use|forward|import)\s+["']([^"']+)["']""")
+
+
+def _resolve_import(dirname: str, name: str) -> str | None:
+    if name.startswith("sass:") or "://" in name:
+        return None
+
+    base = path.join(dirname, name)
+    head, tail = path.split(base)
+    for candidate in [
+        base,
+        f"{base}.scss",
+        path.join(head, f"_{tail}.scss"),
+        f"{base}.css",
+        path.join(base, "_index.scss"),
+        path.join(base, "index.scss"),
+    ]:
+        if path.isfile(candidate):
+            return candidate
+    return None
+
+
+def scss_sources(entry: str) -> list[str]:
+    """
+    Returns ``entry`` and all stylesheets it imports with ``@use``, ``@forward`` or ``@import``, recursively.
+    """
+    sources: list[str] = []
+    pending = [path.abspath(entry)]
+    while pending:
+        filename = pending.pop()
+        if filename in sources:
+            continue
+        sources.append(filename)
+
+        with open(filename) as f:
+            content = f.read()
+        for name in _import_pattern.findall(content):
+            imported = _resolve_import(path.dirname(filename), name)
+            if imported:
+                pending.append(imported)
+
+    return sources
+
+
+def scss_digest(entry: str) -> str:
+    """
+    Hashes the contents of ``entry`` and all its imports.
+    """
+    sha = hashlib.sha256()
+    for filename in sorted(scss_sources(entry)):
+        sha.update(filename.encode())
+        with open(filename, "rb") as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+
+def compile_scss_cached(entry: str) -> str:
+    """
+    Like ``ignis.utils.sass_compile``, but loads the compiled css from ``CACHE_DIR/css`` when the sources are unchanged.
+    """
+    stem = path.splitext(path.basename(entry))[0]
+    with trace_span("scss_digest"):
+        digest = scss_digest(entry)
+    cache_filename = path.join(css_cache_path, f"{stem}-{digest}.css")
+
+    if path.exists(cache_filename):
+        with open(cache_filename) as f:
+            return f.read()
+
+    logger.info(f"compiling stylesheet: {entry}")
+    with trace_span("sass_compile", entry=entry):
+        css = sass_compile(path=entry)
+
+    os.makedirs(css_cache_path, exist_ok=True)
+    # drop outdated caches of the same entry
+    for filename in os.listdir(css_cache_path):
+        if filename.startswith(f"{stem}-") and filename.endswith(".css"):
+            os.remove(path.join(css_cache_path, filename))
+    tmp_filename = cache_filename + ".tmp"
+    with open(tmp_filename, "w") as f:
+        f.write(css)
+    os.replace(tmp_filename, cache_filename)
+
+    return css
+
+
+class ScssWatcher:
+    """
+    Watches ``entry`` and its imports, and reloads the css ``name`` once sources actually change.
+    Bursts of file events (e.g. from editor saves) are debounced into a single reload.
+    """
+
+    def __init__(self, name: str, entry: str, delay: int = 300):
+        self.__css_manager = CssManager.get_default()
+        self.__name = name
+        self.__entry = entry
+        self.__digest = scss_digest(entry)
+        self.__monitors: dict[str, FileMonitor] = {}
+        self.__on_changed = debounce(delay)(self.__reload)
+
+        self.__watch_sources()
+
+    def __watch_sources(self):
+        for dirname in {path.dirname(filename) for filename in scss_sources(self.__entry)}:
+            if dirname not in self.__monitors:
+                self.__monitors[dirname] = FileMonitor(path=dirname, callback=self.__on_file_event)
+
+    def __on_file_event(self, _, filename: str, event_type: str):
+        if filename.endswith((".scss", ".sass", ".css")):
+            self.__on_changed()
+
+    def __reload(self, *_):
+        try:
+            digest = scss_digest(self.__entry)
+        except OSError:
+            # the file may be replaced by the editor, wait for the next event
+            return
+        if digest == self.__digest:
+            return
+
+        self.__digest = digest
+        self.__watch_sources()
+        self.__css_manager.reload_css(self.__name)
@@ -1,14 +1,80 @@
 import shlex
+import time
+from collections import OrderedDict
 
-from gi.repository import Gio
+from gi.repository import Gdk, Gio, GLib, Gtk
 from ignis.services.applications import Application
 from ignis.utils import get_app_icon_name as ignis_get_app_icon_name
+from loguru import logger
 
-app_icon_overrides: dict[str, str] = {}
-app_id_overrides: dict[str, str] = {}
+from .metrics import counter_metric, latency_metric
 
 
-def get_app_id(app_id: str) -> str:
+class _InvalidatingDict(dict[str, str]):
+    """
+    A dict which clears the app cache whenever it is modified.
+    """
+
+    def __setitem__(self, key: str, value: str):
+        super().__setitem__(key, value)
+        invalidate_app_cache()
+
+    def __delitem__(self, key: str):
+        super().__delitem__(key)
+        invalidate_app_cache()
+
+    def clear(self):
+        super().clear()
+        invalidate_app_cache()
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        invalidate_app_cache()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        invalidate_app_cache()
+        return item
+
+    def setdefault(self, key: str, default: str):  # type: ignore
+        value = super().setdefault(key, default)
+        invalidate_app_cache()
+        return value
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        invalidate_app_cache()
+
+
+app_icon_overrides: dict[str, str] = _InvalidatingDict()
+app_id_overrides: dict[str, str] = _InvalidatingDict()
+
+app_cache_size: int = 1024
+_app_cache: OrderedDict[str, tuple[str, str]] = OrderedDict()
+"""Maps raw app ids to ``(normalized app id, icon name)``, least recently used first."""
+_app_cache_hits = counter_metric("desktop.app_cache.hit")
+_app_cache_misses = counter_metric("desktop.app_cache.miss")
+_icon_theme: Gtk.IconTheme | None = None
+
+
+def invalidate_app_cache(*_):
+    """
+    Clears resolved app ids and icon names, e.g. after applications are reinstalled.
+    The cache is also cleared when the icon theme or the overrides change.
+    """
+    _app_cache.clear()
+
+
+def _watch_icon_theme():
+    global _icon_theme
+    display = Gdk.Display.get_default()
+    if _icon_theme is None and display:
+        _icon_theme = Gtk.IconTheme.get_for_display(display)
+        _icon_theme.connect("changed", invalidate_app_cache)
+
+
+def _normalize_app_id(app_id: str) -> str:
     if not app_id:
         app_id = "unknown"
     if app_id.lower().endswith(".desktop"):
@@ -19,17 +85,112 @@ def get_app_id(app_id: str) -> str:
     return app_id
 
 
+def _resolve_app(app_id: str) -> tuple[str, str]:
+    resolved = _app_cache.get(app_id)
+    if resolved:
+        _app_cache.move_to_end(app_id)
+        _app_cache_hits.inc()
+        return resolved
+
+    _app_cache_misses.inc()
+    _watch_icon_theme()
+    normalized = _normalize_app_id(app_id)
+    icon = ignis_get_app_icon_name(normalized) or app_icon_overrides.get(normalized) or "application-default-icon"
+
+    resolved = _app_cache[app_id] = (normalized, icon)
+    if len(_app_cache) > app_cache_size:
+        _app_cache.popitem(last=False)
+    return resolved
+
+
+def get_app_id(app_id: str) -> str:
+    return _resolve_app(app_id)[0]
+
+
 def get_app_icon_name(app_id: str | None = None, app_info: Application | None = None) -> str:
     app_id = app_id or app_info and app_info.id or ""
-    app_id = get_app_id(app_id)
     icon = app_info and app_info.icon
-    if not icon:
-        icon = ignis_get_app_icon_name(app_id)
-    if not icon:
-        icon = app_icon_overrides.get(app_id)
-    if not icon:
-        icon = "application-default-icon"
-    return icon
+    if icon:
+        return icon
+    return _resolve_app(app_id)[1]
+
+
+_field_codes_removed = {"%d", "%D", "%n", "%N", "%v", "%m"}
+_shell_chars = set(";&|<>$`(){}*?~!#\n")
+_launch_shell_fallbacks = counter_metric("launch.shell_fallback")
+
+
+def parse_exec(
+    exec_string: str, files: list[str] | None = None, app_info: Gio.DesktopAppInfo | None = None
+) -> list[str]:
+    """
+    Parses the ``Exec`` key of a desktop entry into an argv, expanding field codes
+    as the desktop entry specification describes.
+
+    ``%f``/``%u`` expand to the first file, ``%F``/``%U`` to all files as separate arguments,
+    ``%i`` to ``--icon <icon>``, ``%c`` to the app name, ``%k`` to the desktop file path,
+    and deprecated field codes are removed, as well as file field codes when there are no files.
+    Paths expanded inside a larger argument, e.g. ``sh -c "foo %f"``, are shell quoted.
+
+    Raises:
+        ValueError: If the quoting is invalid.
+    """
+    files = files or []
+    argv: list[str] = []
+    for arg in shlex.split(exec_string):
+        match arg:
+            case "%F" | "%U":
+                argv.extend(files)
+            case "%f" | "%u":
+                argv.extend(files[:1])
+            case "%i":
+                icon = app_info and app_info.get_string("Icon")
+                if icon:
+                    argv.extend(["--icon", icon])
+            case _ if arg in _field_codes_removed:
+                continue
+            case _:
+                argv.append(_expand_field_codes(arg, files, app_info))
+    return argv
+
+
+def _expand_field_codes(arg: str, files: list[str], app_info: Gio.DesktopAppInfo | None) -> str:
+    # a path in a larger argument is most likely passed to a shell, e.g. sh -c "foo %f"
+    quote = shlex.quote if len(arg) > 2 else str
+    parts: list[str] = []
+    i = 0
+    while i < len(arg):
+        char = arg[i]
+        code = arg[i + 1] if char == "%" and i + 1 < len(arg) else ""
+        match code:
+            case "%":
+                parts.append("%")
+            case "f" | "u":
+                parts.append(quote(files[0]) if files else "")
+            case "c":
+                parts.append((app_info and app_info.get_name()) or "")
+            case "k":
+                filename = app_info and app_info.get_filename()
+                parts.append(quote(filename) if filename else "")
+            case "":
+                parts.append(char)
+                i += 1
+                continue
+            case _:
+                # %F, %U, %i are only valid as a whole argument, and others are deprecated
+                pass
+        i += 2
+    return "".join(parts)
+
+
+def _needs_shell(format: str) -> bool:
+    try:
+        args = shlex.split(format)
+    except ValueError:
+        return True
+    if "%command%" not in args or any(char in format for char in _shell_chars):
+        return True
+    return any("%command%" in arg and arg != "%command%" for arg in args)
 
 
 def launch_application(
@@ -37,33 +198,61 @@ def launch_application(
     files: list[str] | None = None,
     command_format: str | None = None,
     terminal_format: str | None = None,
+    begin_ns: int | None = None,
 ):
-    if not app.exec_string:
-        return
+    """
+    Launches ``app`` with ``files`` as arguments.
 
-    command: str = app.exec_string
+    The ``Exec`` key is parsed into an argv, and spawned directly with the ``Path`` key as cwd,
+    or passed as ``%command%`` of ``command_format`` (``terminal_format`` for terminal apps) when specified.
+    It falls back to a shell only when the format is not a plain argv, or the app needs a cwd behind a format.
 
-    # pass file paths as arguments
-    files = [shlex.quote(file) for file in files or []]
-    file = files[0] if files else ""
-    for k, v in {"%f": file, "%F": " ".join(files), "%u": file, "%U": " ".join(files)}.items():
-        # nautilus --new-window file1 file2
-        command = command.replace(k, v)
+    Args:
+        begin_ns: When the launch is requested, from ``time.perf_counter_ns()``,
+            the latency until the process is spawned is recorded as metric ``launch.<app id>``.
+    """
+    begin_ns = begin_ns or time.perf_counter_ns()
+    if not app.exec_string:
+        return
 
-    # set key "Path" as cwd
     app_info: Gio.DesktopAppInfo = app.app
     cwd = app_info.get_string("Path")
+    format = terminal_format if app.is_terminal else command_format
+
+    try:
+        argv = parse_exec(app.exec_string, files, app_info)
+    except ValueError as e:
+        logger.warning(f"invalid Exec key of {app.id}: {e}")
+        return
+    if not argv:
+        return
+
+    if format and (cwd or _needs_shell(format)):
+        _launch_shell_fallbacks.inc()
+        _launch_shell(app, argv, cwd, format)
+    else:
+        if format:
+            args = shlex.split(format)
+            i = args.index("%command%")
+            argv = args[:i] + argv + args[i + 1 :]
+        try:
+            launcher = Gio.SubprocessLauncher.new(Gio.SubprocessFlags.NONE)
+            if cwd:
+                launcher.set_cwd(cwd)
+            launcher.spawnv(argv)
+        except GLib.Error as e:
+            logger.warning(f"failed to launch {app.id}: {e.message}")
+            return
+
+    latency_metric(f"launch.{app.id}").record_since(begin_ns)
+
+
+def _launch_shell(app: Application, argv: list[str], cwd: str | None, format: str):
+    command = shlex.join(argv)
     if cwd:
         # cd xxx; nautilus --new-window file1 file2
         command = f"cd {shlex.quote(cwd)}; {command}"
 
-    # sh -c "cd xxx; nautilus --new-window file1 file2"
-    command = f"sh -c {shlex.quote(command)}"
-
-    # apply customized launch command
-    format = terminal_format if app.is_terminal else command_format
-    if format:
-        # niri msg action spawn -- foot sh -c "cd xxx; yazi file"
-        command = format.replace("%command%", command)
-
+    # niri msg action spawn -- foot sh -c "cd xxx; yazi file"
+    command = format.replace("%command%", f"sh -c {shlex.quote(command)}")
     app.launch(command_format=command, terminal_format=command)
@@ -0,0 +1,122 @@
+from collections.abc import Callable, Iterable
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _short_grams(text: str, length: int) -> set[str]:
+    return {text[i : i + n] for n in range(1, length + 1) for i in range(len(text) - n + 1)}
+
+
+class FuzzyIndex:
+    """
+    An in-memory search index over weighted text fields, with short gram and trigram postings.
+
+    Every term matches as a substring of a word, so extending a query only ever narrows the results.
+    Terms shorter than three characters are looked up in the postings of all their one and two character grams,
+    longer ones by intersecting trigram postings and verifying the candidates.
+    A document matches a query when all the terms match, and its score is the sum of its best field scores,
+    where field prefixes and word prefixes score higher than other substrings.
+
+    The index is not modified after built, so it is safe to be searched from another thread.
+
+    Example:
+
+    .. code-block:: python
+
+        index = FuzzyIndex()
+        index.add("org.gnome.Nautilus", [("Files", 4), ("nautilus", 2)])
+        index.search("fil")  # {"org.gnome.Nautilus": 12.0}
+    """
+
+    short_length: int = 2
+
+    def __init__(self):
+        self.__fields: dict[str, list[tuple[str, list[str], float]]] = {}
+        self.__short_grams: dict[str, set[str]] = {}
+        self.__trigrams: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.__fields)
+
+    def add(self, key: str, fields: Iterable[tuple[str | None, float]]):
+        """
+        Indexes ``fields`` as ``(text, weight)`` pairs of document ``key``.
+        """
+        entries = self.__fields.setdefault(key, [])
+        for text, weight in fields:
+            if not text:
+                continue
+
+            text = text.lower()
+            words = text.split()
+            entries.append((text, words, weight))
+            for word in words:
+                for gram in _short_grams(word, self.short_length):
+                    self.__short_grams.setdefault(gram, set()).add(key)
+                for trigram in _trigrams(word):
+                    self.__trigrams.setdefault(trigram, set()).add(key)
+
+    def search(
+        self, query: str, candidates: Iterable[str] | None = None, cancelled: Callable[[], bool] | None = None
+    ) -> dict[str, float] | None:
+        """
+        Returns scores of matched documents by key.
+
+        Args:
+            query: Terms separated by spaces, case insensitive.
+            candidates: Only search in these documents, e.g. the results of a shorter query.
+            cancelled: Checked between terms, ``None`` is returned once it is true.
+        """
+        result: dict[str, float] | None = None
+        for term in query.lower().split():
+            if cancelled and cancelled():
+                return None
+
+            keys = self.__lookup(term)
+            if result is not None:
+                keys = keys & result.keys()
+            elif candidates is not None:
+                keys = keys & set(candidates)
+
+            scores: dict[str, float] = {}
+            for key in keys:
+                score = self.__score(key, term)
+                if score > 0:
+                    scores[key] = score + (result[key] if result else 0)
+            result = scores
+
+            if not result:
+                break
+
+        return result or {}
+
+    def __lookup(self, term: str) -> set[str]:
+        if len(term) <= self.short_length:
+            return self.__short_grams.get(term, set())
+
+        postings = sorted((self.__trigrams.get(trigram, set()) for trigram in _trigrams(term)), key=len)
+        if not postings:
+            return set()
+
+        keys = set(postings[0])
+        for posting in postings[1:]:
+            keys &= posting
+            if not keys:
+                break
+        return keys
+
+    def __score(self, key: str, term: str) -> float:
+        best = 0.0
+        for text, words, weight in self.__fields.get(key, []):
+            if text.startswith(term):
+                score = weight * 3
+            elif any(word.startswith(term) for word in words):
+                score = weight * 2
+            elif term in text:
+                score = weight
+            else:
+                continue
+            best = max(best, score)
+        return best
@@ -0,0 +1,151 @@
+from collections.abc import Callable
+
+from gi.repository import GLib, Gtk
+from ignis.exceptions import WindowNotFoundError
+from ignis.utils import Timeout
+from ignis.window_manager import WindowManager
+
+from ..constants import WindowName
+from ..useroptions import user_options
+from .trace import trace_span
+
+wm = WindowManager.get_default()
+
+
+class LazyWindowRegistry:
+    """
+    Builds registered windows the first time they are opened, toggled or requested,
+    and destroys them after being hidden for ``user_options.popup_windows.dispose_delay`` milliseconds.
+
+    Windows which may not be built yet should be opened, closed and toggled through the registry,
+    instead of ``WindowManager`` which only knows built windows.
+
+    Example:
+
+    .. code-block:: python
+
+        lazy_windows.register(WindowName.preferences, Preferences)
+        lazy_windows.open(WindowName.preferences)  # Preferences() is built here
+    """
+
+    def __init__(self):
+        self.__options = user_options and user_options.popup_windows
+        self.__factories: dict[str, Callable[[], Gtk.Window]] = {}
+        self.__windows: dict[str, Gtk.Window] = {}
+        self.__timeouts: dict[str, Timeout] = {}
+
+    def register(self, name: WindowName | str, factory: Callable[[], Gtk.Window]):
+        """
+        Registers a window ``factory`` by its namespace ``name``.
+        The window built by ``factory`` should add itself to ``WindowManager``.
+        """
+        name = name.value if isinstance(name, WindowName) else name
+        self.__factories[name] = factory
+
+    def is_built(self, name: WindowName | str) -> bool:
+        name = name.value if isinstance(name, WindowName) else name
+        return name in self.__windows
+
+    def ensure(self, name: WindowName | str) -> Gtk.Window:
+        """
+        Returns the window ``name``, building it if it is registered but not built yet.
+        Raises ``WindowNotFoundError`` if the window is neither registered nor added to ``WindowManager``.
+        """
+        name = name.value if isinstance(name, WindowName) else name
+        window = self.__windows.get(name)
+        if window:
+            return window
+
+        factory = self.__factories.get(name)
+        if not factory:
+            return wm.get_window(name)
+
+        with trace_span(f"lazy:{name}"):
+            window = factory()
+        self.__windows[name] = window
+        window.connect("notify::visible", lambda *_: self.__on_visible_changed(name))
+        return window
+
+    def open(self, name: WindowName | str):
+        """
+        Opens the window ``name``, building it if needed.
+        """
+        name = name.value if isinstance(name, WindowName) else name
+        self.ensure(name)
+        wm.open_window(name)
+
+    def close(self, name: WindowName | str):
+        """
+        Closes the window ``name``, which is a no-op if it is registered but not built.
+        """
+        name = name.value if isinstance(name, WindowName) else name
+        if name in self.__factories and name not in self.__windows:
+            return
+        wm.close_window(name)
+
+    def toggle(self, name: WindowName | str):
+        """
+        Toggles the window ``name``, building it if needed.
+        """
+        name = name.value if isinstance(name, WindowName) else name
+        self.ensure(name)
+        wm.toggle_window(name)
+
+    def prewarm(self, name: WindowName | str, delay: int = 3000):
+        """
+        Builds the window ``name`` on idle, ``delay`` milliseconds after called (e.g. once startup settles),
+        and calls its ``prewarm()`` method if it has one.
+        A window built by prewarming is disposed after ``dispose_delay`` like a hidden one, unless it is shown.
+        """
+        name = name.value if isinstance(name, WindowName) else name
+
+        def on_idle() -> bool:
+            if name in self.__factories:
+                built = name in self.__windows
+                window = self.ensure(name)
+                prewarm = getattr(window, "prewarm", None)
+                if callable(prewarm):
+                    prewarm()
+                if not built:
+                    # never shown, thus no visibility change starts the dispose timer
+                    self.__on_visible_changed(name)
+            return GLib.SOURCE_REMOVE
+
+        Timeout(ms=delay, target=lambda *_: GLib.idle_add(on_idle, priority=GLib.PRIORITY_LOW))
+
+    def dispose(self, name: WindowName | str):
+        """
+        Destroys the window ``name`` if built; it will be built again on next request.
+        """
+        name = name.value if isinstance(name, WindowName) else name
+        self.__cancel_timeout(name)
+        window = self.__windows.pop(name, None)
+        if not window:
+            return
+
+        window.destroy()
+        try:
+            registered = wm.get_window(name)
+        except WindowNotFoundError:
+            return
+        if registered is window:
+            # not unregistered on destroy, the name must not resolve to a destroyed window
+            wm.remove_window(name)
+
+    def __cancel_timeout(self, name: str):
+        timeout = self.__timeouts.pop(name, None)
+        if timeout:
+            timeout.cancel()
+
+    def __on_visible_changed(self, name: str):
+        window = self.__windows.get(name)
+        if not window:
+            return
+
+        self.__cancel_timeout(name)
+        delay = self.__options.dispose_delay if self.__options else 0
+        if delay > 0 and not window.get_visible():
+            self.__timeouts[name] = Timeout(ms=delay, target=lambda *_: self.dispose(name))
+
+
+lazy_windows = LazyWindowRegistry()
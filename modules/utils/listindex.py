@@ -0,0 +1,64 @@
+import bisect
+from collections.abc import Hashable
+
+
+class PositionIndex[Key: Hashable]:
+    """
+    Positions of keyed items in a list model, where new items are only inserted at the front,
+    e.g. notifications ordered from the newest.
+
+    Every key gets an increasing sequence number when inserted, so the list is in descending order of them,
+    and the position of a key is the number of live sequence numbers greater than its own.
+    Lookups are a bisection, instead of a scan with ``Gio.ListStore.find_with_equal_func``.
+
+    Example:
+
+    .. code-block:: python
+
+        index = PositionIndex()
+        for key in ["a", "b", "c"]:
+            index.prepend(key)  # store.insert(0, ...)
+        index.position("a")  # 2
+        index.remove("b")  # 1, then store.remove(1)
+    """
+
+    def __init__(self):
+        self.__seqs: dict[Key, int] = {}
+        self.__live: list[int] = []
+        """Sequence numbers of live keys, ascending."""
+        self.__next_seq: int = 0
+
+    def __len__(self) -> int:
+        return len(self.__live)
+
+    def __contains__(self, key: Key) -> bool:
+        return key in self.__seqs
+
+    def prepend(self, key: Key):
+        """
+        Records ``key`` inserted at position 0. ``key`` must not be in the index.
+        """
+        self.__seqs[key] = self.__next_seq
+        self.__live.append(self.__next_seq)
+        self.__next_seq += 1
+
+    def position(self, key: Key) -> int | None:
+        seq = self.__seqs.get(key)
+        if seq is None:
+            return None
+        return len(self.__live) - 1 - bisect.bisect_left(self.__live, seq)
+
+    def remove(self, key: Key) -> int | None:
+        """
+        Forgets ``key``, and returns its position to be removed from the list, ``None`` if not found.
+        """
+        seq = self.__seqs.pop(key, None)
+        if seq is None:
+            return None
+        i = bisect.bisect_left(self.__live, seq)
+        del self.__live[i]
+        return len(self.__live) - i
+
+    def clear(self):
+        self.__seqs.clear()
+        self.__live.clear()
@@ -0,0 +1,85 @@
+import time
+from contextlib import contextmanager
+
+
+class LatencyMetric:
+    """
+    Accumulates durations of an operation, in milliseconds.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count: int = 0
+        self.total: float = 0
+        self.last: float = 0
+        self.max: float = 0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0
+
+    def record(self, ms: float):
+        self.count += 1
+        self.total += ms
+        self.last = ms
+        self.max = max(self.max, ms)
+
+    def record_since(self, begin_ns: int):
+        """
+        Records the duration since ``begin_ns``, a timestamp from ``time.perf_counter_ns()``.
+        """
+        self.record((time.perf_counter_ns() - begin_ns) / 1e6)
+
+    @contextmanager
+    def measure(self):
+        begin = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record_since(begin)
+
+    def __str__(self) -> str:
+        return f"{self.name}: count {self.count}, last {self.last:.2f}ms, mean {self.mean:.2f}ms, max {self.max:.2f}ms"
+
+
+class CounterMetric:
+    """
+    Counts occurrences of an event.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.value: int = 0
+
+    def inc(self, n: int = 1):
+        self.value += n
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.value}"
+
+
+_metrics: dict[str, LatencyMetric | CounterMetric] = {}
+
+
+def latency_metric(name: str) -> LatencyMetric:
+    """
+    Returns the latency metric named ``name``, created on first use.
+    """
+    metric = _metrics.get(name)
+    if not isinstance(metric, LatencyMetric):
+        metric = _metrics[name] = LatencyMetric(name)
+    return metric
+
+
+def counter_metric(name: str) -> CounterMetric:
+    """
+    Returns the counter named ``name``, created on first use.
+    """
+    metric = _metrics.get(name)
+    if not isinstance(metric, CounterMetric):
+        metric = _metrics[name] = CounterMetric(name)
+    return metric
+
+
+def format_metrics() -> str:
+    return "\n".join(str(metric) for _, metric in sorted(_metrics.items()))
@@ -0,0 +1,133 @@
+import weakref
+from collections.abc import Callable
+from typing import Any
+
+from gi.repository import GLib, GObject, Gtk
+
+from .misc import unpack_instance_method
+from .signal import WeakCallback, weak_connect_callback
+
+
+class FrameScheduler:
+    """
+    Coalesces bursts of update requests into one call per frame.
+
+    An update is marked dirty by ``schedule``, and invoked once on the next ``Gdk.FrameClock`` tick of its widget,
+    or on idle if the widget is not mapped. Requests made while an update is pending are counted as saved.
+    Pending updates are keyed by a weak reference to their object, and dropped once it is collected.
+
+    Example:
+
+    .. code-block:: python
+
+        class MyBox(Gtk.Box):
+            def __init__(self):
+                super().__init__()
+                connect_coalesced(niri, "notify::windows", self.__on_change)
+                connect_coalesced(niri, "notify::active-window", self.__on_change)
+
+            def __on_change(self, *_):
+                pass  # invoked once, even if both signals are emitted before the next frame
+    """
+
+    def __init__(self):
+        self.__pending: dict[tuple[weakref.ref, Callable], tuple[weakref.ref, Callable, bool]] = {}
+        self.__requested: dict[str, int] = {}
+        self.__executed: dict[str, int] = {}
+        self.__dropped: int = 0
+        """Pending updates whose object is collected."""
+
+    @property
+    def requested(self) -> int:
+        return sum(self.__requested.values())
+
+    @property
+    def executed(self) -> int:
+        return sum(self.__executed.values())
+
+    @property
+    def saved(self) -> int:
+        """
+        Number of requests merged into a pending update.
+        """
+        return self.requested - self.executed - self.__dropped - len(self.__pending)
+
+    def stats(self) -> dict[str, tuple[int, int]]:
+        """
+        Returns ``(requested, executed)`` counts by the qualified name of updates.
+        """
+        return {name: (count, self.__executed.get(name, 0)) for name, count in self.__requested.items()}
+
+    def schedule(self, method: Callable[[], Any], widget: Gtk.Widget | None = None):
+        """
+        Marks the bound ``method`` dirty.
+
+        Args:
+            method: An instance method, invoked without arguments.
+            widget: Whose frame clock to follow, defaults to the bound object of ``method``.
+        """
+        obj, func = unpack_instance_method(method)
+        self.__request(obj, func, widget if widget is not None else obj)
+
+    def __request(self, obj: Any, func: Callable, widget: Any):
+        name = func.__qualname__
+        self.__requested[name] = self.__requested.get(name, 0) + 1
+
+        # equal to the reference of a pending update while obj is alive, never to one of a collected object
+        ref = weakref.ref(obj, self.__on_collected)
+        key = (ref, func)
+        pending = self.__pending.get(key)
+        mapped = isinstance(widget, Gtk.Widget) and widget.get_mapped()
+        if pending:
+            # the widget may be unmapped after a tick is requested, in which case the tick never comes
+            if pending[2] and not mapped:
+                self.__pending[key] = (pending[0], func, False)
+                GLib.idle_add(self.__run_once, key)
+            return
+
+        self.__pending[key] = (ref, func, mapped)
+        if mapped:
+            widget.add_tick_callback(lambda *_: self.__run_once(key))
+        else:
+            GLib.idle_add(self.__run_once, key)
+
+    def __on_collected(self, ref: weakref.ref):
+        for key in [key for key in self.__pending if key[0] is ref]:
+            del self.__pending[key]
+            self.__dropped += 1
+
+    def __run(self, key: tuple[weakref.ref, Callable]):
+        pending = self.__pending.pop(key, None)
+        if not pending:
+            return
+
+        ref, func, _ = pending
+        obj = ref()
+        if obj is None:
+            self.__dropped += 1
+            return
+
+        name = func.__qualname__
+        self.__executed[name] = self.__executed.get(name, 0) + 1
+        func(obj)
+
+    def __run_once(self, key: tuple[weakref.ref, Callable]) -> bool:
+        self.__run(key)
+        return GLib.SOURCE_REMOVE
+
+    def connect(self, gobject: GObject.Object, signal: str, method: Callable[..., Any]) -> WeakCallback:
+        """
+        Connects ``signal`` to schedule the bound ``method``, without keeping its object alive.
+        """
+        obj, func = unpack_instance_method(method)
+        return weak_connect_callback(gobject, signal, obj, lambda _, obj, *__: self.__request(obj, func, obj))
+
+
+frame_scheduler = FrameScheduler()
+
+
+def connect_coalesced(gobject: GObject.Object, signal: str, method: Callable[..., Any]) -> WeakCallback:
+    """
+    Shortcut to ``frame_scheduler.connect``.
+    """
+    return frame_scheduler.connect(gobject, signal, method)
@@ -1,59 +1,278 @@
+import hashlib
+import json
 import os
+import shutil
 import subprocess
 from os import path
 from typing import Any, Callable
+from xml.sax.saxutils import escape
 
-from gi.repository import Gtk
+from gi.repository import Gdk, Gio, GLib, Gtk
 from ignis import CACHE_DIR
+from loguru import logger
+
 from ..constants import CONFIG_DIR
+from .trace import trace_span
 
 blp_ui_path = path.join(CONFIG_DIR, "ui")
 cache_ui_path = path.join(CACHE_DIR, "ui")
+manifest_path = path.join(cache_ui_path, "manifest.json")
+icons_path = path.join(CONFIG_DIR, "icons")
+bundle_path = path.join(CACHE_DIR, "ui.gresource")
+resource_prefix = "/io/github/lost_melody/IgnisNiriShell"
+
+_compiled: bool = False
+_resource: Gio.Resource | None = None
+
+
+def _file_digest(filename: str) -> str:
+    with open(filename, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _compiler_info(cached: dict[str, Any] | None = None) -> dict[str, Any] | None:
+    """
+    Returns ``{"path", "mtime", "version"}`` of ``blueprint-compiler``, or ``None`` if it is not installed.
+    The version is only queried (by spawning the compiler) when the binary differs from ``cached``.
+    """
+    binary = shutil.which("blueprint-compiler")
+    if not binary:
+        return None
+
+    mtime = os.path.getmtime(binary)
+    if cached and cached.get("path") == binary and cached.get("mtime") == mtime and cached.get("version"):
+        return cached
+
+    result = subprocess.run(args=[binary, "--version"], capture_output=True, text=True)
+    return {"path": binary, "mtime": mtime, "version": result.stdout.strip()}
+
+
+def _load_manifest() -> dict[str, Any]:
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if isinstance(manifest, dict):
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def _save_manifest(manifest: dict[str, Any]):
+    os.makedirs(cache_ui_path, exist_ok=True)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
 
+def list_blueprints() -> list[str]:
+    """
+    Lists all ``.blp`` files under ``ui/``, relative to it and without suffix, e.g. ``controlcenter/audio-group``.
+    """
+    names: list[str] = []
+    for root, _, files in os.walk(blp_ui_path):
+        names.extend(path.relpath(path.join(root, file), blp_ui_path)[:-4] for file in files if file.endswith(".blp"))
+    return sorted(names)
 
-def build_blueprint(blp_filename: str, ui_filename: str):
-    os.makedirs(os.path.dirname(ui_filename), exist_ok=True)
 
-    result = subprocess.run(args=["blueprint-compiler", "compile", "--out", ui_filename, blp_filename])
+def list_icons() -> list[str]:
+    """
+    Lists all bundled icons under ``icons/``, relative to the config directory, e.g. ``icons/scalable/actions/x.svg``.
+    """
+    names: list[str] = []
+    for root, _, files in os.walk(icons_path):
+        names.extend(
+            path.relpath(path.join(root, file), CONFIG_DIR) for file in files if file.endswith((".svg", ".png"))
+        )
+    return sorted(names)
+
+
+def build_blueprints(names: list[str]):
+    """
+    Compiles ``ui/<name>.blp`` into ``CACHE_DIR/ui/<name>.ui`` for all ``names`` in a single compiler run.
+    """
+    if not names:
+        return
+
+    if not shutil.which("blueprint-compiler"):
+        raise Exception("blueprint-compiler is required to compile blueprint files")
+
+    os.makedirs(cache_ui_path, exist_ok=True)
+    blp_filenames = [path.join(blp_ui_path, name + ".blp") for name in names]
+    result = subprocess.run(args=["blueprint-compiler", "batch-compile", cache_ui_path, blp_ui_path, *blp_filenames])
 
     if result.returncode != 0:
         raise Exception(f"blueprint-compiler exits with return code {result.returncode}")
 
 
-def ensure_ui_file(filename: str) -> str:
-    blp_filename = os.path.join(blp_ui_path, filename + ".blp")
-    ui_filename = os.path.join(cache_ui_path, filename + ".ui")
+def build_ui_bundle(ui_names: list[str], icon_files: list[str]) -> bool:
+    """
+    Packs compiled ``.ui`` files and bundled icons into ``CACHE_DIR/ui.gresource``.
+    Returns ``False`` if ``glib-compile-resources`` is not installed.
+    """
+    compiler = shutil.which("glib-compile-resources")
+    if not compiler:
+        logger.warning("glib-compile-resources is not found, ui files are loaded from the cache directory")
+        return False
 
-    blp_exist = os.path.exists(blp_filename)
-    ui_exist = os.path.exists(ui_filename)
+    files = [f"ui/{name}.ui" for name in ui_names] + icon_files
+    xml_filename = bundle_path + ".xml"
+    with open(xml_filename, "w") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<gresources>\n')
+        f.write(f'  <gresource prefix="{resource_prefix}">\n')
+        for file in files:
+            f.write(f"    <file>{escape(file)}</file>\n")
+        f.write("  </gresource>\n</gresources>\n")
 
-    if blp_exist:
-        if ui_exist:
-            blp_mtime = os.path.getmtime(blp_filename)
-            ui_mtime = os.path.getmtime(ui_filename)
+    tmp_path = bundle_path + ".tmp"
+    result = subprocess.run(
+        args=[compiler, "--sourcedir", CACHE_DIR, "--sourcedir", CONFIG_DIR, "--target", tmp_path, xml_filename]
+    )
+    if result.returncode != 0:
+        raise Exception(f"glib-compile-resources exits with return code {result.returncode}")
 
-            if ui_mtime < blp_mtime:
-                build_blueprint(blp_filename, ui_filename)
-        else:
-            build_blueprint(blp_filename, ui_filename)
-    else:
-        if ui_exist:
-            pass
-        else:
-            raise Exception(f"blueprint file `{blp_filename}` does not exist")
+    os.replace(tmp_path, bundle_path)
+    return True
+
+
+def load_ui_bundle() -> Gio.Resource | None:
+    """
+    Maps ``CACHE_DIR/ui.gresource`` into memory, registers it and adds its icons to the icon theme.
+    """
+    if not path.exists(bundle_path):
+        return None
+
+    try:
+        resource = Gio.Resource.load(bundle_path)
+    except GLib.Error as e:
+        logger.warning(f"failed to load ui bundle: {e}")
+        return None
+
+    Gio.resources_register(resource)
+    display = Gdk.Display.get_default()
+    if display and path.isdir(icons_path):
+        Gtk.IconTheme.get_for_display(display).add_resource_path(f"{resource_prefix}/icons")
+
+    return resource
+
+
+def _bundle_digest(compiler: dict[str, Any] | None, hashes: dict[str, str], icons: dict[str, str]) -> str:
+    data = json.dumps({"compiler": (compiler or {}).get("version"), "files": hashes, "icons": icons}, sort_keys=True)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def compile_ui_files(force: bool = False) -> list[str]:
+    """
+    Compiles all stale blueprints under ``ui/``, rebuilds the resource bundle if needed,
+    and returns names of the compiled blueprints.
+
+    Freshness is tracked by a manifest in ``CACHE_DIR/ui`` holding the content hash of every ``.blp`` file,
+    the compiler version and a digest of the bundle, so that a warm start only reads the manifest and the sources.
+    """
+    manifest = _load_manifest()
+    cached_compiler = manifest.get("compiler")
+    compiler = _compiler_info(cached_compiler) or cached_compiler
+    same_compiler = (compiler or {}).get("version") == (cached_compiler or {}).get("version")
+    old_hashes: dict[str, str] = manifest.get("files", {}) if same_compiler and not force else {}
+
+    hashes = {name: _file_digest(path.join(blp_ui_path, name + ".blp")) for name in list_blueprints()}
+    stale = [
+        name
+        for name, digest in hashes.items()
+        if old_hashes.get(name) != digest or not path.exists(path.join(cache_ui_path, name + ".ui"))
+    ]
+
+    if stale and not shutil.which("blueprint-compiler"):
+        # fall back to previously compiled ui files, and keep them stale until the compiler is available
+        outdated = [name for name in stale if path.exists(path.join(cache_ui_path, name + ".ui"))]
+        if outdated:
+            logger.warning(f"blueprint-compiler is not found, using existing ui files: {', '.join(outdated)}")
+        for name in outdated:
+            hashes[name] = old_hashes.get(name, "")
+        stale = [name for name in stale if name not in outdated]
+
+    if stale:
+        logger.info(f"compiling {len(stale)} blueprint(s): {', '.join(stale)}")
+        with trace_span("build_blueprints", count=len(stale)):
+            build_blueprints(stale)
+
+    icons = {file: _file_digest(path.join(CONFIG_DIR, file)) for file in list_icons()}
+    bundle: str | None = _bundle_digest(compiler, hashes, icons)
+    if bundle != manifest.get("bundle") or not path.exists(bundle_path):
+        with trace_span("build_ui_bundle"):
+            built = build_ui_bundle(list(hashes), list(icons))
+        if not built:
+            bundle = None
+            if path.exists(bundle_path):
+                # never load an outdated bundle
+                os.remove(bundle_path)
+
+    new_manifest = {"compiler": compiler, "files": hashes, "bundle": bundle}
+    if new_manifest != manifest:
+        _save_manifest(new_manifest)
+
+    return stale
+
+
+def _ensure_compiled():
+    global _compiled, _resource
+    if not _compiled:
+        with trace_span("compile_ui_files"):
+            compile_ui_files()
+            _resource = load_ui_bundle()
+        _compiled = True
+
+
+def ui_resource_path(filename: str) -> str | None:
+    """
+    Returns the resource path of ``<filename>.ui`` if it is packed in the bundle.
+    """
+    _ensure_compiled()
+    if not _resource:
+        return None
+
+    resource_path = f"{resource_prefix}/ui/{filename}.ui"
+    try:
+        _resource.get_info(resource_path, Gio.ResourceLookupFlags.NONE)
+        return resource_path
+    except GLib.Error:
+        return None
+
+
+def ensure_ui_file(filename: str) -> str:
+    _ensure_compiled()
+
+    ui_filename = os.path.join(cache_ui_path, filename + ".ui")
+    if not os.path.exists(ui_filename):
+        blp_filename = os.path.join(blp_ui_path, filename + ".blp")
+        raise Exception(f"blueprint file `{blp_filename}` does not exist")
 
     return ui_filename
 
 
 def gtk_template[Widget: type[Gtk.Widget]](filename: str) -> Callable[[Widget], Widget]:
-    template = Gtk.Template(filename=ensure_ui_file(filename))
+    with trace_span(f"gtk_template:{filename}"):
+        resource_path = ui_resource_path(filename)
+        if resource_path:
+            template = Gtk.Template(resource_path=resource_path)
+        else:
+            template = Gtk.Template(filename=ensure_ui_file(filename))
 
     def decorator(cls: Widget) -> Widget:
-        return template(cls)  # type: ignore
+        with trace_span(f"gtk_template:{filename}", cls=cls.__name__):
+            return template(cls)  # type: ignore
 
     return decorator
 
 
+def gtk_builder(filename: str) -> Gtk.Builder:
+    resource_path = ui_resource_path(filename)
+    if resource_path:
+        return Gtk.Builder.new_from_resource(resource_path)
+    return Gtk.Builder.new_from_file(ensure_ui_file(filename))
+
+
 def gtk_template_child() -> Any:
     return Gtk.Template.Child()  # type: ignore
 
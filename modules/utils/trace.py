@@ -0,0 +1,129 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from os import path
+from typing import Any
+
+from gi.repository import Gtk
+from ignis import CACHE_DIR
+from ignis.utils import Timeout
+from loguru import logger
+
+_trace_env = os.environ.get("IGNIS_STARTUP_TRACE", "")
+trace_enabled: bool = _trace_env not in ["", "0"]
+trace_filename: str = path.join(CACHE_DIR, "startup-trace.json") if _trace_env in ["", "0", "1"] else _trace_env
+
+_pid = os.getpid()
+_events: list[dict[str, Any]] = []
+_finished: bool = False
+
+
+def _now_us() -> float:
+    return time.perf_counter_ns() / 1000
+
+
+def trace_instant(name: str, **args: Any):
+    """
+    Records an instant event.
+    """
+    if trace_enabled and not _finished:
+        _events.append(
+            {
+                "name": name,
+                "ph": "i",
+                "s": "p",
+                "ts": _now_us(),
+                "pid": _pid,
+                "tid": threading.get_ident(),
+                "args": args,
+            }
+        )
+
+
+@contextmanager
+def trace_span(name: str, **args: Any):
+    """
+    Records the duration of the ``with`` block as a complete event.
+    Nested spans are shown as a flame graph by the trace viewer.
+
+    Example:
+
+    .. code-block:: python
+
+        with trace_span("Topbar", monitor=0):
+            Topbar(0)
+    """
+    if not trace_enabled or _finished:
+        yield
+        return
+
+    begin = _now_us()
+    try:
+        yield
+    finally:
+        end = _now_us()
+        _events.append(
+            {
+                "name": name,
+                "ph": "X",
+                "ts": begin,
+                "dur": end - begin,
+                "pid": _pid,
+                "tid": threading.get_ident(),
+                "args": args,
+            }
+        )
+
+
+def write_trace(filename: str | None = None):
+    """
+    Writes recorded events in the Chrome trace format, which can be opened in ``chrome://tracing`` or Perfetto.
+    """
+    filename = path.abspath(filename or trace_filename)
+    os.makedirs(path.dirname(filename), exist_ok=True)
+    with open(filename, "w") as f:
+        json.dump({"traceEvents": _events, "displayTimeUnit": "ms"}, f)
+    logger.info(f"startup trace written to {filename}")
+
+
+def _finish_trace(name: str, **args: Any):
+    global _finished
+    if _finished:
+        return
+    trace_instant(name, **args)
+    _finished = True
+    write_trace()
+
+
+def finish_trace_on_first_frame(window: Gtk.Window):
+    """
+    Records the first frame presented by ``window``, then stops tracing and writes the trace file.
+    """
+    if not trace_enabled:
+        return
+
+    def on_after_paint(clock, spec: list[int]):
+        clock.disconnect(spec[0])
+        _finish_trace("first-frame", window=window.get_name())
+
+    def on_map(*_):
+        clock = window.get_frame_clock()
+        if clock:
+            spec: list[int] = []
+            spec.append(clock.connect("after-paint", on_after_paint, spec))
+
+    if window.get_mapped():
+        on_map()
+    else:
+        window.connect("map", on_map)
+
+
+def finish_trace_after(ms: int):
+    """
+    Stops tracing and writes the trace file after ``ms`` milliseconds, if no first frame has finished it by then,
+    e.g. when no monitor is connected.
+    """
+    if trace_enabled:
+        Timeout(ms=ms, target=lambda: _finish_trace("timeout", ms=ms))
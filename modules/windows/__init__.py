@@ -1,9 +1,11 @@
 from ..constants import WindowName
+from ..utils import LazyWindowRegistry, lazy_windows
 from .appdock import AppDock
 from .applauncher import AppLauncher
 from .backdrop import OverlayBackdrop
 from .controlcenter import ControlCenter, NotificationPopups
 from .fcitxkimpopup import FcitxKimPopup
+from .monitors import MonitorManager
 from .osd import OnscreenDisplay
 from .preferences import Preferences
 from .topbar import Topbar
@@ -14,6 +16,8 @@ __all__ = [
     AppLauncher,
     ControlCenter,
     FcitxKimPopup,
+    LazyWindowRegistry,
+    MonitorManager,
     NotificationPopups,
     OnscreenDisplay,
     OverlayBackdrop,
@@ -21,4 +25,5 @@ __all__ = [
     Topbar,
     WallpaperWindow,
     WindowName,
+    lazy_windows,
 ]
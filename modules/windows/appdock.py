@@ -1,156 +1,41 @@
+import time
+
 from gi.repository import Gdk, Gio, Gtk
 from ignis.menu_model import IgnisMenuItem, IgnisMenuModel, IgnisMenuSeparator, ItemsType
-from ignis.services.applications import Application, ApplicationsService
-from ignis.services.hyprland import HyprlandService, HyprlandWindow
-from ignis.services.niri import NiriService, NiriWindow
+from ignis.services.applications import Application
+from ignis.services.hyprland import HyprlandService
+from ignis.services.niri import NiriService
 from ignis.utils import Timeout
+from ignis.variable import Variable
 from ignis.widgets import Window
 
 from ..constants import WindowName
+from ..services import (
+    AppEntry,
+    AppSnapshotService,
+    LaunchHistoryService,
+    WindowIndexDelta,
+    WindowIndexService,
+    WindowInfo,
+)
 from ..useroptions import user_options
 from ..utils import (
     SpecsBase,
     WeakMethod,
     connect_option,
+    frame_scheduler,
     get_app_icon_name,
     get_app_id,
     get_widget_monitor,
     gtk_template,
     gtk_template_child,
-    hypr_command,
     launch_application,
-    niri_action,
     set_on_click,
     set_on_scroll,
+    weak_connect,
 )
 
 
-class WindowInfo:
-    """
-    A wrapper to unify queries on ``NiriWindow`` and ``HyprlandWindow``.
-    """
-
-    def __init__(self, window: NiriWindow | HyprlandWindow):
-        self.window = window
-
-        self.id = 0
-        self.pid = window.pid
-        self.app_id = ""
-        self.workspace_id = window.workspace_id
-        self.title = window.title
-
-        if isinstance(window, NiriWindow):
-            self.id = window.id
-            self.app_id = window.app_id
-        else:
-            self.id = window.pid
-            self.app_id = window.class_name
-
-    def focus(self):
-        if isinstance(self.window, NiriWindow):
-            self.window.focus()
-        elif isinstance(self.window, HyprlandWindow):
-            hypr_command(f"dispatch focuswindow pid:{self.window.pid}")
-            hypr_command("dispatch alterzorder top")
-
-    def maximize(self):
-        self.focus()
-        if isinstance(self.window, NiriWindow):
-            if not self.window.is_floating:
-                niri_action("MaximizeColumn")
-        elif isinstance(self.window, HyprlandWindow):
-            hypr_command("dispatch fullscreen 1")
-
-    def fullscreen(self):
-        self.focus()
-        if isinstance(self.window, NiriWindow):
-            niri_action("FullscreenWindow", {"id": self.window.id})
-        elif isinstance(self.window, HyprlandWindow):
-            hypr_command("dispatch fullscreen 0")
-
-    def toggle_floating(self):
-        self.focus()
-        if isinstance(self.window, NiriWindow):
-            niri_action("ToggleWindowFloating", {"id": self.window.id})
-        elif isinstance(self.window, HyprlandWindow):
-            hypr_command(f"dispatch togglefloating pid:{self.window.pid}")
-
-    def close(self):
-        if isinstance(self.window, NiriWindow):
-            niri_action("CloseWindow", {"id": self.window.id})
-        elif isinstance(self.window, HyprlandWindow):
-            hypr_command(f"dispatch closewindow pid:{self.window.pid}")
-
-
-class WindowFocusHistory:
-    """
-    Manages windows focus history.
-    Every time a new window is focused, ``sequence`` is increased by one,
-    and the window is assigned to the sequence.
-    """
-
-    initialized: bool = False
-    sequence: int = 0
-    focused_window_id: int = 0
-    # dict[win_id, hist_id]
-    focus_hist: dict[int, int] = {}
-
-    @classmethod
-    def get_focus_hist(cls, window_id: int):
-        """
-        Queries the focus sequence of the window.
-        """
-        return cls.focus_hist.get(window_id, 0)
-
-    @classmethod
-    def focus_window(cls, window_id: int):
-        """
-        Updates the current focused window id.
-        """
-        if cls.focused_window_id == window_id:
-            return
-
-        cls.sequence += 1
-        cls.focus_hist[window_id] = cls.sequence
-
-    @classmethod
-    def find_latest_index(cls, windows: list[WindowInfo] | None = None):
-        """
-        Finds the index of the latest focused window in ``windows``.
-        Returns ``-1`` if not found.
-        """
-        i = 0
-        idx = -1
-        latest = 0
-        for win in windows or []:
-            id = win.id
-            hist = cls.get_focus_hist(id)
-            if hist > latest:
-                idx = i
-                latest = hist
-            i += 1
-        return idx
-
-    @classmethod
-    def sync_windows(cls, windows: list[WindowInfo] | None = None):
-        if not windows:
-            cls.initialized = True
-            return
-
-        if cls.initialized:
-            id_set = None
-            if windows and len(windows) != len(cls.focus_hist):
-                id_set = set(w.id for w in windows)
-            if id_set:
-                for id in id_set:
-                    cls.focus_hist.pop(id, None)
-        else:
-            cls.initialized = True
-            if windows:
-                for id in [w.id for w in sorted(windows, key=lambda w: w.id)]:
-                    cls.focus_window(id)
-
-
 @gtk_template("appdock")
 class AppDockView(Gtk.Box):
     __gtype_name__ = "IgnisAppDockView"
@@ -193,14 +78,18 @@ class AppDockView(Gtk.Box):
 
         def __init__(self):
             self.__app_options = user_options and user_options.applauncher
+            self.__focus_history = WindowIndexService.get_default().focus_history
             self.__app_id: str = ""
-            self.__app_info: Application | None = None
+            self.__app_info: AppEntry | None = None
             self.__windows: list[WindowInfo] = []
             super().__init__()
             SpecsBase.__init__(self)
 
             self.__idx: int = 0
+            self.__state: tuple | None = None
+            """Window ids, titles and the focused index last displayed."""
             self.__menu = IgnisMenuModel()
+            self.__menu_outdated: bool = True
             self.__dots_store = Gio.ListStore()
             self.dots.bind_model(self.__dots_store, lambda i: i)
             set_on_click(self.icon, left=WeakMethod(self.__on_clicked), right=WeakMethod(self.__on_right_clicked))
@@ -227,11 +116,11 @@ class AppDockView(Gtk.Box):
             self.icon.set_from_icon_name(get_app_icon_name(self.app_id))
 
         @property
-        def app_info(self) -> Application | None:
+        def app_info(self) -> AppEntry | None:
             return self.__app_info
 
         @app_info.setter
-        def app_info(self, app_info: Application | None):
+        def app_info(self, app_info: AppEntry | None):
             self.__app_info = app_info
             self.pin_icon.set_visible(True if app_info and app_info.is_pinned else False)
 
@@ -241,15 +130,22 @@ class AppDockView(Gtk.Box):
 
         @windows.setter
         def windows(self, windows: list[WindowInfo]):
+            self.update_windows(windows)
+
+        def update_windows(self, windows: list[WindowInfo], force: bool = False) -> bool:
+            """
+            Syncs ``windows`` to the dots and tooltip, and returns whether anything displayed is changed.
+            """
+            windows = sorted(windows, key=lambda w: w.id)
+            idx = max(self.__focus_history.find_latest_index(windows), 0)
+            state = (tuple((w.id, w.title) for w in windows), idx)
+            if not force and state == self.__state:
+                return False
+            self.__state = state
+
             self.__dots_store.remove_all()
             if windows:
-                windows = sorted(windows, key=lambda w: w.id)
                 self.__windows = windows
-
-                idx = WindowFocusHistory.find_latest_index(windows)
-                if idx < 0:
-                    idx = 0
-
                 self.set_tooltip_text(f"{self.app_id} - {windows[idx].title}")
                 self.__update_dots(idx, len(windows))
                 self.__idx = idx
@@ -260,6 +156,7 @@ class AppDockView(Gtk.Box):
                     self.set_tooltip_text(f"{self.app_id} - {self.app_info.name}\n{self.app_info.description}")
                 else:
                     self.set_tooltip_text(self.app_id)
+            return True
 
         def __update_dots(self, index: int, length: int):
             if index <= 2:
@@ -273,14 +170,21 @@ class AppDockView(Gtk.Box):
                 dot.set_focused(focused)
                 self.__dots_store.append(dot)
 
+        def invalidate_menu(self):
+            """
+            Marks the context menu outdated, it is rebuilt the next time it pops up.
+            """
+            self.__menu_outdated = True
+
         def rebuild_menu(self):
+            self.__menu_outdated = False
             self.menu.set_menu_model(None)
             self.__menu.clean_gmenu()
 
             items: ItemsType = []
             # application menu
-            if self.app_info:
-                app = self.app_info
+            app = self.app_info and AppSnapshotService.get_default().get_application(self.app_info)
+            if app:
                 self.__menu_application(items, app)
 
             # active windows menu
@@ -336,15 +240,18 @@ class AppDockView(Gtk.Box):
             items.append(IgnisMenuItem("Close All Windows", True, lambda _: close_all_windows(windows)))
 
         def __launch_app(self, files: list[str] | None = None):
-            if not self.app_info:
+            begin = time.perf_counter_ns()
+            app = self.app_info and AppSnapshotService.get_default().get_application(self.app_info)
+            if not app:
                 return
 
             command_format = self.__app_options.command_format
             terminal_format = self.__app_options.terminal_format
 
             launch_application(
-                self.app_info, files=files, command_format=command_format, terminal_format=terminal_format
+                app, files=files, command_format=command_format, terminal_format=terminal_format, begin_ns=begin
             )
+            LaunchHistoryService.get_default().record(app.id)
 
         def __on_clicked(self, *_):
             if self.windows:
@@ -353,12 +260,14 @@ class AppDockView(Gtk.Box):
                 self.__launch_app()
 
         def __on_right_clicked(self, *_):
+            if self.__menu_outdated:
+                self.rebuild_menu()
             self.menu.popup()
 
         def __on_scrolled(self, _, dx: float, dy: float):
             delta = 1 if dx + dy > 0 else -1
             if self.windows:
-                idx = WindowFocusHistory.find_latest_index(self.windows)
+                idx = self.__focus_history.find_latest_index(self.windows)
                 if idx >= 0:
                     idx = (idx + delta) % len(self.windows)
                 else:
@@ -376,18 +285,19 @@ class AppDockView(Gtk.Box):
 
     def __init__(self):
         self.__dock_options = user_options.appdock
-        self.__apps = ApplicationsService.get_default()
+        self.__apps = AppSnapshotService.get_default()
         self.__niri = NiriService.get_default()
         self.__hypr = HyprlandService.get_default()
+        self.__index = WindowIndexService.get_default()
 
         self.__windows: list[WindowInfo] = []
         """Windows to display in dock."""
         self.__items: dict[str, AppDockView.Item] = {}
         """Maps ``app_id`` to ``DockItem``."""
-        self.__monitor_ws: set[int] = set()
-        """Workspace ids in the current monitor."""
-        self.__active_ws: set[int] = set()
-        """Focused workspace ids in any monitors."""
+        self.__app_dict: dict[str, AppEntry] = {}
+        """Maps ``app_id`` to installed applications, rebuilt only when the applications change."""
+        self.__pinned_set: set[str] = set()
+        """Ids of pinned applications."""
         self.__connector: str | None = None
         """Currently focused monitor connector/name."""
 
@@ -405,26 +315,11 @@ class AppDockView(Gtk.Box):
         drop_target.connect("leave", self.__on_mouse_leave)
         self.add_controller(drop_target)
 
-        self.__apps.connect("notify::pinned", self.__on_pinned_changed)
+        weak_connect(self.__apps, "changed", self.__on_apps_changed)
+        self.__sync_apps()
+        weak_connect(self.__index, "changed", self.__on_index_changed)
         if self.__niri.is_available:
-            WindowFocusHistory.sync_windows([WindowInfo(w) for w in self.__niri.windows])
-            self.__niri.connect("notify::workspaces", self.__on_workspaces_changed)
-            self.__niri.connect("notify::windows", self.__on_windows_changed)
-            self.__niri.connect(
-                "notify::active-window", lambda *_: WindowFocusHistory.focus_window(self.__niri.active_window.id)
-            )
-            self.__niri.connect("notify::active-window", self.__on_windows_changed)
-            self.__niri.connect("notify::overview-opened", self.__on_overview_changed)
-        if self.__hypr.is_available:
-            WindowFocusHistory.sync_windows([WindowInfo(w) for w in self.__hypr.windows])
-            self.__hypr.connect("notify::workspaces", self.__on_workspaces_changed)
-            self.__hypr.connect("notify::windows", self.__on_windows_changed)
-            self.__hypr.connect(
-                "notify::active-window", lambda *_: WindowFocusHistory.focus_window(self.__hypr.active_window.pid)
-            )
-            self.__hypr.connect("notify::active-window", self.__on_windows_changed)
-            for monitor in self.__hypr.monitors:
-                monitor.connect("notify::active-workspace-id", self.__on_workspaces_changed)
+            weak_connect(self.__niri, "notify::overview-opened", self.__on_overview_changed)
         if self.__dock_options:
             connect_option(self.__dock_options, "auto_conceal", self.__on_auto_conceal_changed)
             connect_option(self.__dock_options, "monitor_only", self.__on_options_changed)
@@ -446,6 +341,7 @@ class AppDockView(Gtk.Box):
         monitor = get_widget_monitor(self)
         if monitor:
             self.__connector = monitor.get_connector()
+        self.__on_windows_changed()
         self.__on_auto_conceal_changed()
 
     def __on_overview_changed(self, *_):
@@ -497,79 +393,90 @@ class AppDockView(Gtk.Box):
         return (ka > kb) - (ka < kb)
 
     def __on_options_changed(self, *_):
-        self.__on_workspaces_changed()
-
-    def __on_pinned_changed(self, *_):
-        self.__refresh()
+        self.__on_windows_changed()
 
-    def __on_workspaces_changed(self, *_):
-        if self.__niri.is_available:
-            self.__monitor_ws = set(ws.id for ws in self.__niri.workspaces if ws.output == self.__connector)
-            self.__active_ws = set(ws.id for ws in self.__niri.workspaces if ws.is_active)
-        elif self.__hypr.is_available:
-            self.__monitor_ws = set(ws.id for ws in self.__hypr.workspaces if ws.monitor == self.__connector)
-            self.__active_ws = set(m.active_workspace_id for m in self.__hypr.monitors)
-        else:
+    def __sync_apps(self):
+        self.__app_dict = {get_app_id(entry.id): entry for entry in self.__apps.entries}
+        self.__pinned_set = {app_id for app_id, entry in self.__app_dict.items() if entry.is_pinned}
+
+    def __on_apps_changed(self, *_):
+        self.__sync_apps()
+        self.__refresh(apps_changed=True)
+
+    def __on_index_changed(self, _, variable: Variable):
+        delta: WindowIndexDelta = variable.value
+        # changes on other monitors are not displayed
+        if (
+            (self.__dock_options.monitor_only or self.__dock_options.workspace_only)
+            and self.__connector not in delta.outputs
+            and not delta.workspaces_changed
+        ):
             return
 
-        self.__on_windows_changed()
+        # one refresh per frame for bursts of compositor events
+        frame_scheduler.schedule(self.__on_windows_changed)
 
     def __on_windows_changed(self, *_):
-        self.__windows = [
-            WindowInfo(win) for win in (self.__niri.windows if self.__niri.is_available else self.__hypr.windows)
-        ]
         if self.__dock_options.monitor_only:
-            self.__windows = [win for win in self.__windows if win.workspace_id in self.__monitor_ws]
+            self.__windows = self.__index.get_output_windows(self.__connector)
         elif self.__dock_options.workspace_only:
-            self.__windows = [win for win in self.__windows if win.workspace_id in self.__monitor_ws & self.__active_ws]
+            workspaces = self.__index.get_output_workspaces(self.__connector) & self.__index.active_workspaces
+            self.__windows = [win for ws in workspaces for win in self.__index.get_workspace_windows(ws)]
+        else:
+            self.__windows = self.__index.windows
 
         self.__refresh()
 
-    def __refresh(self):
-        pinned_set = {get_app_id(app.id) for app in self.__apps.pinned if app.id}
+    def __refresh(self, apps_changed: bool = False):
+        """
+        Diffs the displayed apps against pinned apps and open windows, and only touches the affected items.
+        Items are re-sorted only when they are added or removed, or pin states are changed.
+        """
+        # group open windows by app id
+        app_windows: dict[str, list[WindowInfo]] = {}
+        for window in self.__windows:
+            app_windows.setdefault(get_app_id(window.app_id), []).append(window)
         # all the items to display: pinned apps and open windows
-        app_id_set = pinned_set | ({get_app_id(win.app_id) for win in self.__windows})
-        # map app id to app info
-        app_dict = {get_app_id(app.id): app for app in self.__apps.apps if app.id}
+        app_id_set = self.__pinned_set | app_windows.keys()
 
         # remove dock items that are not in app_id_set
-        for app_id in [app_id for app_id in self.__items if app_id not in app_id_set]:
+        removed = [app_id for app_id in self.__items if app_id not in app_id_set]
+        for app_id in removed:
             dock_item = self.__items.pop(app_id)
             self.flow_box.remove(dock_item)
             dock_item.run_dispose()
+
         # create missing dock items from app_id_set
-        for app_id in app_id_set:
-            dock_item = self.__items.get(app_id)
-            if not dock_item:
-                dock_item = self.Item()
-                self.__items[app_id] = dock_item
-                self.flow_box.append(dock_item)
+        added: set[str] = set()
+        for app_id in app_id_set - self.__items.keys():
+            dock_item = self.Item()
             dock_item.app_id = app_id
-            dock_item.app_info = app_dict.get(app_id)
+            dock_item.app_info = self.__app_dict.get(app_id)
+            self.__items[app_id] = dock_item
+            self.flow_box.append(dock_item)
+            added.add(app_id)
 
-        # sync open windows to dock items
-        app_windows: dict[str, list[WindowInfo]] = {}
-        for window in self.__windows:
-            app_id = get_app_id(window.app_id)
-            if app_id not in app_windows:
-                app_windows[app_id] = []
-            app_windows[app_id].append(window)
+        # sync app info and open windows to the affected dock items
         for app_id, item in self.__items.items():
-            item.windows = app_windows.get(app_id, [])
+            changed = app_id in added
+            if apps_changed:
+                # app infos and pin states are rarely changed, simply resync them all
+                item.app_info = self.__app_dict.get(app_id)
+                changed = True
+            if item.update_windows(app_windows.get(app_id, []), force=app_id in added) or changed:
+                item.invalidate_menu()
 
-        # refresh flow_box
-        for item in self.__items.values():
-            item.rebuild_menu()
-        self.flow_box.invalidate_sort()
+        if added or removed or apps_changed:
+            self.flow_box.invalidate_sort()
 
 
 class AppDock(Window):
     __gtype_name__ = "IgnisAppDock"
 
-    def __init__(self, monitor: int = 0):
+    def __init__(self, monitor: int = 0, connector: str | None = None):
         self.__options = user_options and user_options.appdock
         super().__init__(
-            namespace=f"{WindowName.app_dock.value}-{monitor}",
+            namespace=f"{WindowName.app_dock.value}-{connector or monitor}",
             monitor=monitor,
             anchor=["bottom"],
             css_classes=["rounded-tl", "rounded-tr", "transparent"],
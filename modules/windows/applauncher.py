@@ -1,25 +1,47 @@
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from os import path
 from typing import Any, Callable
 
-from gi.repository import Gdk, Gio, GObject, Gtk
+from gi.repository import Gdk, Gio, GLib, GObject, Gtk
 from ignis.menu_model import IgnisMenuItem, IgnisMenuModel, IgnisMenuSeparator, ItemsType
-from ignis.services.applications import Application, ApplicationAction, ApplicationsService
+from ignis.services.applications import ApplicationAction
 from ignis.widgets import Window
 
 from ..constants import WindowName
+from ..services import AppEntry, AppSnapshotService, LaunchHistoryService
 from ..useroptions import user_options
 from ..utils import (
+    FuzzyIndex,
     SpecsBase,
     connect_option,
     connect_window,
-    get_app_icon_name,
+    counter_metric,
     gtk_template,
     gtk_template_callback,
     gtk_template_child,
+    latency_metric,
     launch_application,
     set_on_click,
+    weak_connect,
 )
 from ..widgets import RevealerWindow
 from .backdrop import overlay_window
+from .search_providers import (
+    CalculatorProvider,
+    PathProvider,
+    ProviderPipeline,
+    RecentFilesProvider,
+    SearchResult,
+    WindowsProvider,
+)
+
+_search_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="applauncher-search")
+_search_latency = latency_metric("applauncher.search")
+_search_dropped = counter_metric("applauncher.search.dropped")
+_prewarm_latency = latency_metric("applauncher.prewarm.step")
+_open_latency = latency_metric("applauncher.open")
 
 
 @gtk_template(filename="applauncher-item")
@@ -35,15 +57,16 @@ class AppLauncherGridItem(Gtk.Box, SpecsBase):
         super().__init__()
         SpecsBase.__init__(self)
 
-        self._app: Application | None = None
+        self._entry: AppEntry | SearchResult | None = None
         self._menu = IgnisMenuModel()
+        self.__menu_outdated: bool = True
 
-        set_on_click(self, left=lambda s: s.__launch_app(), right=lambda s: s.menu.popup())
+        set_on_click(self, left=lambda s: s.__launch_app(), right=lambda s: s.__popup_menu())
 
     def __launch_app(self):
         view = self.get_ancestor(AppLauncherView)
-        if self.application and isinstance(view, AppLauncherView):
-            view.launch_application(self.application)
+        if self.entry and isinstance(view, AppLauncherView):
+            view.activate_item(self.entry)
             view.on_search_stop()
 
     def __launch_action(self, action: ApplicationAction):
@@ -52,44 +75,55 @@ class AppLauncherGridItem(Gtk.Box, SpecsBase):
         if isinstance(view, AppLauncherView):
             view.on_search_stop()
 
-    def __build_menu(self, app: Application):
+    def __popup_menu(self):
+        if self.__menu_outdated and self.entry:
+            self.__build_menu(self.entry)
+        self.menu.popup()
+
+    def __build_menu(self, entry: AppEntry | SearchResult):
+        self.__menu_outdated = False
+        self.menu.set_menu_model(None)
+        self._menu.clean_gmenu()
+
         items: ItemsType = []
         items.append(IgnisMenuItem("Launch", True, lambda _: self.__launch_app()))
-        items.append(
-            IgnisMenuItem(
-                label="Unpin" if app.is_pinned else "Pin",
-                enabled=True,
-                on_activate=lambda _: app.unpin() if app.is_pinned else app.pin(),
+
+        app = isinstance(entry, AppEntry) and AppSnapshotService.get_default().get_application(entry)
+        if app:
+            items.append(
+                IgnisMenuItem(
+                    label="Unpin" if app.is_pinned else "Pin",
+                    enabled=True,
+                    on_activate=lambda _: app.unpin() if app.is_pinned else app.pin(),
+                )
             )
-        )
 
-        if app.actions:
-            items.append(IgnisMenuSeparator())
-        for action in app.actions:
-            items.append(IgnisMenuItem(action.name, True, lambda _, act=action: self.__launch_action(act)))
+            if app.actions:
+                items.append(IgnisMenuSeparator())
+            for action in app.actions:
+                items.append(IgnisMenuItem(action.name, True, lambda _, act=action: self.__launch_action(act)))
 
         self._menu.items = items
         self.menu.set_menu_model(self._menu.gmenu)
 
-    def __connect_signals(self, app: Application):
-        self.signal(app, "notify::is-pinned", lambda *_: self.__build_menu(app))
-        self.signal(app, "notify::is-pinned", lambda *_: self.pinned.set_visible(app.is_pinned))
+    def __connect_signals(self, entry: AppEntry | SearchResult):
+        self.signal(entry, "notify", lambda *_: self.__refresh(entry))
 
     def __clear(self):
         """
-        Clears all menus, signals, bindings to ``Application``.
+        Clears all menus, signals, bindings to ``AppEntry``.
         """
+        self.__menu_outdated = True
         self.menu.set_menu_model()
         self._menu.clean_gmenu()
         self.clear_specs()
 
-    def __refresh(self, app: Application):
-        self.__build_menu(app)
-        self.__connect_signals(app)
-        self.pinned.set_visible(app.is_pinned)
-        self.icon.set_from_icon_name(get_app_icon_name(app_info=app))
-        self.label.set_text(app.name)
-        self.set_tooltip_text(app.description)
+    def __refresh(self, entry: AppEntry | SearchResult):
+        self.__menu_outdated = True
+        self.pinned.set_visible(entry.is_pinned)
+        self.icon.set_from_icon_name(entry.icon_name)
+        self.label.set_text(entry.name)
+        self.set_tooltip_text(entry.description)
 
     def do_dispose(self):
         self.__clear()
@@ -97,15 +131,16 @@ class AppLauncherGridItem(Gtk.Box, SpecsBase):
         super().do_dispose()  # type: ignore
 
     @property
-    def application(self) -> Application | None:
-        return self._app
+    def entry(self) -> AppEntry | SearchResult | None:
+        return self._entry
 
-    @application.setter
-    def application(self, app: Application | None):
-        self._app = app
+    @entry.setter
+    def entry(self, entry: AppEntry | SearchResult | None):
+        self._entry = entry
         self.__clear()
-        if app:
-            self.__refresh(app)
+        if entry:
+            self.__refresh(entry)
+            self.__connect_signals(entry)
 
 
 @gtk_template(filename="applauncher")
@@ -122,8 +157,9 @@ class AppLauncherView(Gtk.Box):
     list_store: Gio.ListStore = gtk_template_child()
 
     class Factory(Gtk.SignalListItemFactory):
-        def __init__(self):
+        def __init__(self, new_item: Callable[[], "AppLauncherGridItem"]):
             super().__init__()
+            self.__new_item = new_item
 
             self.connect("setup", self.__class__.__item_setup)
             self.connect("bind", self.__class__.__item_bind)
@@ -131,18 +167,18 @@ class AppLauncherView(Gtk.Box):
             self.connect("teardown", self.__class__.__item_teardown)
 
         def __item_setup(self, item: Gtk.ListItem):
-            item.set_child(AppLauncherGridItem())
+            item.set_child(self.__new_item())
 
         def __item_bind(self, item: Gtk.ListItem):
-            app = item.get_item()
+            entry = item.get_item()
             grid_item = item.get_child()
-            if isinstance(app, Application) and isinstance(grid_item, AppLauncherGridItem):
-                grid_item.application = app
+            if isinstance(entry, (AppEntry, SearchResult)) and isinstance(grid_item, AppLauncherGridItem):
+                grid_item.entry = entry
 
         def __item_unbind(self, item: Gtk.ListItem):
             grid_item = item.get_child()
             if isinstance(grid_item, AppLauncherGridItem):
-                grid_item.application = None
+                grid_item.entry = None
 
         def __item_teardown(self, item: Gtk.ListItem):
             grid_item = item.get_child()
@@ -150,32 +186,213 @@ class AppLauncherView(Gtk.Box):
             if isinstance(grid_item, AppLauncherGridItem):
                 grid_item.run_dispose()
 
+    prewarm_count: int = 24
+    """Grid items on the first page."""
+    icon_size: int = 32
+    frecency_weight: float = 4
+    """Search score added to the most frecent applications, about a prefix match of a keyword."""
+
     def __init__(self):
-        self.__service = ApplicationsService.get_default()
+        self.__service = AppSnapshotService.get_default()
+        self.__launches = LaunchHistoryService.get_default()
         super().__init__()
 
-        self.__filter = Gtk.CustomFilter()
-        self.__sorter = Gtk.CustomSorter()
-        self.app_grid.set_factory(self.Factory())
+        self.__index = FuzzyIndex()
+        self.__query: str = ""
+        """The query of the applied ``__result``."""
+        self.__result: dict[str, float] | None = None
+        """Scores of matched applications by id, ``None`` if not searching."""
+        self.__generation: int = 0
+        """Increased on every query, results of older generations are dropped."""
+        self.__boosts: dict[str, float] = {}
+        """Search scores added by frecency, evaluated once before every sort so that comparisons only look them up."""
+        self.__update_boosts()
+        self.__filter = Gtk.CustomFilter.new(self.__apps_filter)
+        self.__sorter = Gtk.CustomSorter.new(self.__apps_sorter)
+        self.__prewarmed_items: list[AppLauncherGridItem] = []
+        self.__prewarmed_icons: dict[str, Gtk.IconPaintable] = {}
+        """Keeps textures of icons on the first page loaded."""
+        self.app_grid.set_factory(self.Factory(self.__new_grid_item))
         self.filter_list.set_filter(self.__filter)
         self.sort_list.set_sorter(self.__sorter)
 
-        self.__service.connect("notify::apps", self.__on_apps_changed)
+        # applications and streamed results of other providers, merged and ranked by the sorter
+        self.__pipeline = ProviderPipeline(
+            [WindowsProvider(), CalculatorProvider(), PathProvider(), RecentFilesProvider()]
+        )
+        sources = Gio.ListStore(item_type=Gio.ListModel)
+        sources.append(self.filter_list)
+        for store in self.__pipeline.stores:
+            sources.append(store)
+        self.sort_list.set_model(Gtk.FlattenListModel.new(sources))
+
+        weak_connect(self.__service, "changed", self.__on_apps_changed)
+        weak_connect(self.__launches, "changed", self.__on_launches_changed)
         connect_window(self, "notify::visible", self.__on_window_visible_change)
 
         self.__app_options = user_options and user_options.applauncher
+        self.__on_apps_changed()
+
+    def __new_grid_item(self) -> AppLauncherGridItem:
+        if self.__prewarmed_items:
+            return self.__prewarmed_items.pop()
+        return AppLauncherGridItem()
+
+    def prewarm(self):
+        """
+        Builds grid items and loads icon textures for the first page on idle, a few per main loop iteration,
+        so that the first opening only hits warm caches.
+        """
+        if self.get_mapped():
+            # already opened, nothing to warm up
+            return
+
+        theme = Gtk.IconTheme.get_for_display(self.get_display())
+        scale = self.get_scale_factor()
+        entries = [self.sort_list.get_item(i) for i in range(min(self.prewarm_count, self.sort_list.get_n_items()))]
+
+        def steps():
+            for entry in entries:
+                if not isinstance(entry, AppEntry):
+                    continue
+
+                # templates, css nodes and label layouts
+                grid_item = AppLauncherGridItem()
+                grid_item.entry = entry
+                grid_item.entry = None
+                self.__prewarmed_items.append(grid_item)
+                yield True
+
+                # icon textures at the displayed size
+                icon_name = entry.icon_name
+                if icon_name and icon_name not in self.__prewarmed_icons:
+                    paintable = theme.lookup_icon(
+                        icon_name, None, self.icon_size, scale, Gtk.TextDirection.NONE, Gtk.IconLookupFlags.PRELOAD
+                    )
+                    paintable.snapshot(Gtk.Snapshot(), self.icon_size, self.icon_size)
+                    self.__prewarmed_icons[icon_name] = paintable
+                yield True
+
+        def step(it) -> bool:
+            with _prewarm_latency.measure():
+                return next(it, False)
+
+        GLib.idle_add(step, steps(), priority=GLib.PRIORITY_LOW)
 
     def __on_apps_changed(self, *_):
-        self.list_store.remove_all()
+        """
+        Reconciles ``list_store`` with the entries in a single splice.
+        Entries are updated in place, so unchanged rows keep their bound widgets, scroll position and selection.
+        """
+        entries = self.__service.entries
+        store = self.list_store
+        old_items: list[AppEntry] = [store.get_item(i) for i in range(store.get_n_items())]  # type: ignore
+
+        # only splice the range between the common prefix and suffix
+        length = min(len(old_items), len(entries))
+        start = 0
+        while start < length and old_items[start] is entries[start]:
+            start += 1
+        end = 0
+        while end < length - start and old_items[-1 - end] is entries[-1 - end]:
+            end += 1
+        if start + end < len(old_items) or start + end < len(entries):
+            store.splice(start, len(old_items) - start - end, entries[start : len(entries) - end])
+
+        self.__index = self.__build_index(entries)
+        if self.__query:
+            self.__search(self.__query, force=True)
+
+    @staticmethod
+    def __build_index(entries: list[AppEntry]) -> FuzzyIndex:
+        index = FuzzyIndex()
+        for entry in entries:
+            index.add(
+                entry.id,
+                [
+                    (entry.name, 4),
+                    (entry.generic_name, 3),
+                    (" ".join(entry.keywords), 2),
+                    (path.basename(entry.executable), 2),
+                    (entry.categories.replace(";", " "), 1),
+                ],
+            )
+        return index
 
-        apps = self.__service.apps
-        for app in apps:
-            self.list_store.append(app)
+    def __search(self, query: str, force: bool = False):
+        """
+        Searches the index on a worker thread,
+        narrowing down the previous results if ``query`` extends the previous one.
+        In-flight searches are cancelled, and only the latest result is applied to the filter and sorter.
+        """
+        self.__generation += 1
+        generation = self.__generation
+        begin = time.perf_counter_ns()
+
+        if not query.strip():
+            self.__apply_result(generation, begin, query, None, Gtk.FilterChange.LESS_STRICT)
+            return
+
+        index, prev_query, prev_result = self.__index, self.__query, self.__result
+        if not force and prev_result is not None and query.startswith(prev_query):
+            candidates = prev_result.keys()
+            change = Gtk.FilterChange.MORE_STRICT
+        else:
+            candidates = None
+            more_general = not force and prev_result is not None and prev_query.startswith(query)
+            change = Gtk.FilterChange.LESS_STRICT if more_general else Gtk.FilterChange.DIFFERENT
+
+        def cancelled() -> bool:
+            return generation != self.__generation
+
+        def search():
+            result = index.search(query, candidates=candidates, cancelled=cancelled)
+            if result is None:
+                _search_dropped.inc()
+                return
+            GLib.idle_add(self.__apply_result, generation, begin, query, result, change)
+
+        _search_executor.submit(search)
+
+    def __apply_result(
+        self, generation: int, begin: int, query: str, result: dict[str, float] | None, change: Gtk.FilterChange
+    ) -> bool:
+        if generation != self.__generation:
+            _search_dropped.inc()
+            return GLib.SOURCE_REMOVE
+
+        self.__query, self.__result = query, result
+        self.__filter.changed(change)
+        self.__update_boosts()
+        self.__sorter.changed(Gtk.SorterChange.DIFFERENT)
+        _search_latency.record_since(begin)
+        return GLib.SOURCE_REMOVE
+
+    def activate_item(self, item: AppEntry | SearchResult):
+        if isinstance(item, AppEntry):
+            self.launch_application(item)
+        else:
+            item.activate()
+
+    def launch_application(self, entry: AppEntry):
+        begin = time.perf_counter_ns()
+        app = self.__service.get_application(entry)
+        if not app:
+            return
 
-    def launch_application(self, app: Application):
         command_format = self.__app_options and self.__app_options.command_format
         terminal_format = self.__app_options and self.__app_options.terminal_format
-        launch_application(app, command_format=command_format, terminal_format=terminal_format)
+        launch_application(app, command_format=command_format, terminal_format=terminal_format, begin_ns=begin)
+        self.__launches.record(entry.id)
+
+    def __on_launches_changed(self, *_):
+        self.__update_boosts()
+        self.__sorter.changed(Gtk.SorterChange.DIFFERENT)
+
+    def __update_boosts(self):
+        # frecency normalized into [0, 1), lifting applications over close matches but not over much better ones
+        scores = self.__launches.get_scores()
+        self.__boosts = {app_id: self.frecency_weight * score / (score + 1) for app_id, score in scores.items()}
 
     def __move_selection(self, delta: int):
         pos, count = self.selection.get_selected(), self.selection.get_n_items()
@@ -195,12 +412,19 @@ class AppLauncherView(Gtk.Box):
         if not window.get_visible():
             self.search_bar.set_search_mode(False)
 
-    def __apps_filter(self, app: Application, result: dict[str, int]) -> bool:
-        return app.id in result
+    def __apps_filter(self, entry: AppEntry) -> bool:
+        return self.__result is None or entry.id in self.__result
+
+    def __sort_key(self, item: AppEntry | SearchResult) -> tuple[float, float, str]:
+        if isinstance(item, SearchResult):
+            return (-item.score, math.inf, item.name)
+        score = (self.__result or {}).get(item.id, 0) + self.__boosts.get(item.id, 0)
+        return (-score, -self.__launches.get_rank(item.id), item.name)
 
-    def __apps_sorter(self, a: Application, b: Application, result: dict[str, int]) -> int:
-        pa, pb = a.id and result.get(a.id), b.id and result.get(b.id)
-        return (pa or 0) - (pb or 0)
+    def __apps_sorter(self, a: AppEntry | SearchResult, b: AppEntry | SearchResult, *_) -> int:
+        # higher search scores blended with frecency first, then more frecent applications, then by names
+        ka, kb = self.__sort_key(a), self.__sort_key(b)
+        return (ka > kb) - (ka < kb)
 
     @gtk_template_callback
     def on_items_changed(self, *_):
@@ -210,8 +434,8 @@ class AppLauncherView(Gtk.Box):
     @gtk_template_callback
     def on_item_activate(self, _: Gtk.ListView, pos: int):
         item = self.selection.get_item(pos)
-        if isinstance(item, Application):
-            self.launch_application(item)
+        if isinstance(item, (AppEntry, SearchResult)):
+            self.activate_item(item)
         self.on_search_stop()
 
     @gtk_template_callback
@@ -223,20 +447,10 @@ class AppLauncherView(Gtk.Box):
     @gtk_template_callback
     def on_search_changed(self, *_):
         search_text = self.search_entry.get_text()
-        if search_text != "":
-            search_result = {
-                app_id: priority
-                for priority, result in enumerate(Gio.DesktopAppInfo.search(search_text))
-                for app_id in result
-            }
-            self.__filter.set_filter_func(self.__apps_filter, search_result)
-            self.__sorter.set_sort_func(self.__apps_sorter, search_result)
-
-            if not self.search_bar.get_search_mode():
-                self.search_bar.set_search_mode(True)
-        else:
-            self.__filter.set_filter_func(None)
-            self.__sorter.set_sort_func(None)
+        self.__search(search_text)
+        self.__pipeline.search(search_text)
+        if search_text != "" and not self.search_bar.get_search_mode():
+            self.search_bar.set_search_mode(True)
 
     @gtk_template_callback
     def on_search_next(self, *_):
@@ -260,6 +474,7 @@ class AppLauncher(RevealerWindow):
 
     def __init__(self):
         self.__view = AppLauncherView()
+        self.__open_begin: int | None = None
 
         super().__init__(
             namespace=WindowName.app_launcher.value,
@@ -306,8 +521,34 @@ class AppLauncher(RevealerWindow):
     def set_property(self, property_name: str, value: Any):
         if property_name == "visible":
             overlay_window.update_window_visible(self.namespace, value)
+            if value and not self.get_visible():
+                self.__measure_open()
         super().set_property(property_name, value)
 
+    def prewarm(self):
+        self.__view.prewarm()
+
+    def __measure_open(self):
+        """
+        Records the latency from opening to the first frame presented.
+        """
+        self.__open_begin = time.perf_counter_ns()
+
+        def on_after_paint(clock: Gdk.FrameClock, spec: list[int]):
+            clock.disconnect(spec[0])
+            if self.__open_begin is not None:
+                _open_latency.record_since(self.__open_begin)
+                self.__open_begin = None
+
+        def on_map(*_):
+            self.disconnect(map_spec)
+            clock = self.get_frame_clock()
+            if clock:
+                spec: list[int] = []
+                spec.append(clock.connect("after-paint", on_after_paint, spec))
+
+        map_spec = self.connect("map", on_map)
+
     def __on_exclusive_focus_changed(self, *_):
         opts = user_options and user_options.applauncher
         if opts:
@@ -1,13 +1,16 @@
 from ignis.variable import Variable
 from ignis.widgets import Box, Revealer
-from ignis.window_manager import WindowManager
 
 from ..constants import WindowName
-from ..utils import WeakMethod, set_on_click, weak_connect_method
+from ..utils import (
+    WeakMethod,
+    lazy_windows,
+    set_on_click,
+    weak_connect,
+    weak_connect_method,
+)
 from ..widgets import RevealerWindow
 
-wm = WindowManager.get_default()
-
 
 class OverlayWindow(Variable):
     def __init__(self, value=None):
@@ -26,7 +29,7 @@ class OverlayWindow(Variable):
         previous = self.value
         if previous != name:
             if previous is not None:
-                wm.close_window(previous)
+                lazy_windows.close(previous)
             self.value = name
 
     def unset_window(self, name: str):
@@ -40,7 +43,7 @@ overlay_window = OverlayWindow()
 class OverlayBackdrop(RevealerWindow):
     __gtype_name__ = "IgnisBackdrop"
 
-    def __init__(self, monitor: int):
+    def __init__(self, monitor: int, connector: str | None = None):
         self.__revealer = Revealer(
             hexpand=True,
             vexpand=True,
@@ -50,7 +53,7 @@ class OverlayBackdrop(RevealerWindow):
         self.__view = Box(hexpand=True, vexpand=True, child=[self.__revealer])
 
         super().__init__(
-            namespace=f"{WindowName.backdrop.value}-{monitor}",
+            namespace=f"{WindowName.backdrop.value}-{connector or monitor}",
             monitor=monitor,
             exclusivity="ignore",
             anchor=["top", "right", "bottom", "left"],
@@ -61,7 +64,7 @@ class OverlayBackdrop(RevealerWindow):
             revealer=self.__revealer,
         )
 
-        overlay_window.connect("notify::value", self.__on_overlay_window_changed)
+        weak_connect(overlay_window, "notify::value", self.__on_overlay_window_changed)
         set_on_click(
             self.__view,
             left=WeakMethod(self.__on_backdrop_clicked),
@@ -76,4 +79,4 @@ class OverlayBackdrop(RevealerWindow):
     def __on_backdrop_clicked(self, *_):
         window_name = overlay_window.get_window()
         if window_name is not None:
-            wm.close_window(window_name)
+            lazy_windows.close(window_name)
@@ -1,10 +1,11 @@
 import math
-import urllib.parse
+import weakref
 from asyncio import Task, create_task
+from collections import deque
 from datetime import datetime
 from typing import Any, Callable
 
-from gi.repository import Adw, Gio, GLib, Gtk
+from gi.repository import Adw, Gdk, Gio, GLib, Gtk
 from ignis.options import options
 from ignis.services.audio import AudioService, Stream
 from ignis.services.backlight import BacklightDevice, BacklightService
@@ -15,33 +16,42 @@ from ignis.services.power_profiles import PowerProfilesService
 from ignis.services.recorder import RecorderConfig, RecorderService
 from ignis.utils import AsyncCompletedProcess, Poll
 from ignis.widgets import Icon, Window
-from ignis.window_manager import WindowManager
 
 from ..constants import AudioStreamType, WindowName
+from ..services import (
+    NotificationGroup,
+    NotificationGroupList,
+    NotificationImageCache,
+    get_image_filename,
+)
 from ..useroptions import user_options
 from ..utils import (
     GProperty,
+    PositionIndex,
+    SignalSpec,
     SpecsBase,
     WeakMethod,
     clear_dir,
     connect_option,
     connect_window,
-    ensure_ui_file,
+    counter_metric,
     escape_pango_markup,
+    gtk_builder,
     gtk_template,
     gtk_template_callback,
     gtk_template_child,
+    latency_metric,
+    lazy_windows,
     niri_action,
     run_cmd_async,
     set_on_click,
     verify_pango_markup,
+    weak_connect,
 )
 from ..variables import caffeine_state
 from ..widgets import RevealerWindow
 from .backdrop import overlay_window
 
-wm = WindowManager.get_default()
-
 
 @gtk_template("controlcenter/audio-group")
 class AudioControlGroup(Gtk.Box):
@@ -143,15 +153,15 @@ class AudioControlGroup(Gtk.Box):
         match stream_type:
             case AudioStreamType.speaker:
                 self._default = self.__service.speaker
-                self.__service.connect("speaker_added", self.__on_stream_added)
+                weak_connect(self.__service, "speaker_added", self.__on_stream_added)
             case AudioStreamType.microphone:
                 self._default = self.__service.microphone
-                self.__service.connect("microphone_added", self.__on_stream_added)
+                weak_connect(self.__service, "microphone_added", self.__on_stream_added)
 
         if self._default is not None:
-            self._default.connect("notify::description", self.__on_volume_changed)
-            self._default.connect("notify::icon-name", self.__on_volume_changed)
-            self._default.connect("notify::volume", self.__on_volume_changed)
+            weak_connect(self._default, "notify::description", self.__on_volume_changed)
+            weak_connect(self._default, "notify::icon-name", self.__on_volume_changed)
+            weak_connect(self._default, "notify::volume", self.__on_volume_changed)
             self.__on_volume_changed()
 
     def __on_window_visible_change(self, window: Window, _):
@@ -282,7 +292,7 @@ class BacklightControlGroup(Gtk.ListBox):
         self.__list = Gio.ListStore()
         self.bind_model(self.__list, lambda i: i)
 
-        self.__service.connect("notify::devices", self.__on_devices_changed)
+        weak_connect(self.__service, "notify::devices", self.__on_devices_changed)
         self.__on_devices_changed()
 
     def __on_devices_changed(self, *_):
@@ -303,7 +313,7 @@ class ControlSwitchPill(Gtk.Button):
         super().__init__()
         self.set_css_classes(["m-1", "rounded"])
 
-        builder = Gtk.Builder.new_from_file(ensure_ui_file("controlcenter/switchpill"))
+        builder = gtk_builder("controlcenter/switchpill")
         self._pill: Gtk.Box = builder.get_object("pill")  # type: ignore
         self._icon: Gtk.Image = builder.get_object("icon")  # type: ignore
         self._title: Gtk.Inscription = builder.get_object("title")  # type: ignore
@@ -347,6 +357,12 @@ class ControlSwitchCmd(ControlSwitchPill):
 
         self.set_on_click(self.__on_clicked)
 
+    def do_dispose(self):
+        if self._poll:
+            self._poll.cancel()
+            self._poll = None
+        super().do_dispose()  # type: ignore
+
     @GProperty(type=str)
     def title(self) -> str:
         return self._title.get_text() or ""
@@ -538,8 +554,8 @@ class IgnisRecorder(ControlSwitchPill):
         self.set_subtitle("screen recorder")
         self.set_tooltip_text("Click to start/stop; right click to pause")
 
-        self.__service.connect("notify::active", self.__on_status_changed)
-        self.__service.connect("notify::is-paused", self.__on_status_changed)
+        weak_connect(self.__service, "notify::active", self.__on_status_changed)
+        weak_connect(self.__service, "notify::is-paused", self.__on_status_changed)
         self.set_on_click(self.__on_clicked)
         set_on_click(self, right=self.__on_right_clicked)
         self.__on_status_changed()
@@ -562,7 +578,7 @@ class IgnisRecorder(ControlSwitchPill):
             else:
                 self.__service.stop_recording()
         else:
-            wm.close_window(WindowName.control_center.value)
+            lazy_windows.close(WindowName.control_center)
             create_task(self.__service.start_recording(RecorderConfig.new_from_options()))
 
     def __on_right_clicked(self, *_):
@@ -616,7 +632,7 @@ class CaffeineSwitch(ControlSwitchPill):
         self.set_icon("my-caffeine-off-symbolic")
         self.set_tooltip_text("Click to toggle")
 
-        self.__state.connect("notify::value", self.__on_changed)
+        weak_connect(self.__state, "notify::value", self.__on_changed)
         self.set_on_click(self.__on_clicked)
 
     def __on_changed(self, *_):
@@ -646,7 +662,7 @@ class PowerProfilesSwitch(ControlSwitchPill):
         self.__service = PowerProfilesService.get_default()
         if self.__service.is_available:
             self.set_style_accent(True)
-            self.__service.connect("notify::active-profile", self.__on_changed)
+            weak_connect(self.__service, "notify::active-profile", self.__on_changed)
             self.__on_changed()
             self.set_on_click(self.__on_clicked)
             set_on_click(self, right=self.__on_right_clicked)
@@ -677,8 +693,8 @@ class EthernetStatus(ControlSwitchPill):
 
         self.set_title("Ethernet")
 
-        self.__ethernet.connect("notify::icon-name", self.__on_status_changed)
-        self.__ethernet.connect("notify::devices", self.__on_status_changed)
+        weak_connect(self.__ethernet, "notify::icon-name", self.__on_status_changed)
+        weak_connect(self.__ethernet, "notify::devices", self.__on_status_changed)
         self.__on_status_changed()
 
     def __on_status_changed(self, *_):
@@ -713,8 +729,8 @@ class WifiStatus(ControlSwitchPill):
 
         self.set_title("Wifi")
 
-        self.__wifi.connect("notify::icon-name", self.__on_status_changed)
-        self.__wifi.connect("notify::devices", self.__on_status_changed)
+        weak_connect(self.__wifi, "notify::icon-name", self.__on_status_changed)
+        weak_connect(self.__wifi, "notify::devices", self.__on_status_changed)
         self.set_on_click(self.__on_clicked)
 
     def __on_status_changed(self, *_):
@@ -756,16 +772,23 @@ class BluetoothStatus(ControlSwitchPill):
 
         self.set_title("Bluetooth")
 
-        self.__service.connect("notify::state", self.__on_status_changed)
-        self.__service.connect("notify::devices", self.__on_devices_changed)
+        weak_connect(self.__service, "notify::state", self.__on_status_changed)
+        weak_connect(self.__service, "notify::devices", self.__on_devices_changed)
         self.__devices_signals: list[tuple[BluetoothDevice, int]] = []
         self.set_on_click(self.__on_clicked)
 
-    def __on_devices_changed(self, *_):
+    def do_dispose(self):
+        self.__disconnect_devices()
+        super().do_dispose()  # type: ignore
+
+    def __disconnect_devices(self):
         for device, id in self.__devices_signals:
             device.disconnect(id)
         self.__devices_signals.clear()
 
+    def __on_devices_changed(self, *_):
+        self.__disconnect_devices()
+
         for device in self.__service.devices:
             id = device.connect("notify::connected", self.__on_status_changed)
             self.__devices_signals.append((device, id))
@@ -795,47 +818,107 @@ class BluetoothStatus(ControlSwitchPill):
         self.__service.powered = not self.__service.powered
 
 
+_clear_all_latency = latency_metric("notifications.clear_all")
+_popups_coalesced = counter_metric("notifications.popups.coalesced")
+_popups_dropped = counter_metric("notifications.popups.dropped")
+
+
+def _notify_key(notify: Notification) -> tuple[int, float]:
+    return notify.id, notify.time
+
+
 @gtk_template("controlcenter/notification-item")
-class NotificationItem(Gtk.ListBoxRow, SpecsBase):
+class NotificationItem(Gtk.Box, SpecsBase):
+    """
+    A notification card, built once for a popup, or recycled across notifications by ``NotificationCenter``.
+    """
+
     __gtype_name__ = "NotificationItem"
 
+    icon_pixel_size: int = 32
+    """Pixel size of ``Gtk.IconSize.LARGE``, which images are downscaled to."""
+
     revealer: Gtk.Revealer = gtk_template_child()
     action_row: Adw.ActionRow = gtk_template_child()
     icon: Icon = gtk_template_child()
     time: Gtk.Label = gtk_template_child()
+    expand: Gtk.ToggleButton = gtk_template_child()
     actions: Gtk.Box = gtk_template_child()
 
-    def __init__(self, notification: Notification):
-        self._notification = notification
+    def __init__(self, notification: Notification | None = None, is_popup: bool = False):
+        self._notification: Notification | None = None
         self._is_popup = False
         super().__init__()
         SpecsBase.__init__(self)
 
-        self.__update_notification()
-        self.signal(notification, "closed", self.__on_closed)
-        self.signal(notification, "dismissed", self.__on_dismissed)
+        self.__notify_specs: list[SignalSpec] = []
+        """Signals of the bound notification."""
+        self.__group_specs: list[SignalSpec] = []
+        """Signals of the bound group."""
+        self._group: NotificationGroup | None = None
+        self.__tree_row: Gtk.TreeListRow | None = None
+        self.__concealed: Callable[[], Any] | None = None
+
         self.signal(self.revealer, "notify::child-revealed", self.__on_child_revealed)
         self.signal(self, "map", lambda *_: self.revealer.set_reveal_child(True))
+        self.signal(self, "notify::scale-factor", self.__on_scale_factor_changed)
 
         set_on_click(self.action_row, left=WeakMethod(self.__on_clicked), right=WeakMethod(self.__on_right_clicked))
 
+        self.is_popup = is_popup
+        self.notification = notification
+
     def do_dispose(self):
+        self.__notify_specs.clear()
+        self.__group_specs.clear()
         self.clear_specs()
         self.dispose_template(self.__class__)
         super().do_dispose()  # type: ignore
 
     @property
     def notify_id(self) -> int:
-        return self.notification.id
+        return self.notification.id if self.notification else 0
 
     @property
     def notify_ts(self) -> float:
-        return self.notification.time
+        return self.notification.time if self.notification else 0
 
     @property
-    def notification(self) -> Notification:
+    def notification(self) -> Notification | None:
         return self._notification
 
+    @notification.setter
+    def notification(self, notification: Notification | None):
+        self.__finish_conceal()
+        self.__notify_specs.clear()
+        self._notification = notification
+        if not notification:
+            return
+
+        self.__update_notification(notification)
+        if self.is_popup:
+            self.__notify_specs.append(SignalSpec.new(notification, "closed", self.__on_dismissed))
+            self.__notify_specs.append(SignalSpec.new(notification, "dismissed", self.__on_dismissed))
+
+    @property
+    def group(self) -> NotificationGroup | None:
+        return self._group
+
+    def set_group(self, group: NotificationGroup | None, tree_row: Gtk.TreeListRow | None = None):
+        """
+        Shows the latest notification of ``group``, with a toggle to expand ``tree_row`` to earlier ones.
+        """
+        self.__group_specs.clear()
+        self._group, self.__tree_row = group, tree_row
+        if not group:
+            self.expand.set_visible(False)
+            return
+
+        self.__group_specs.append(SignalSpec.new(group, "notify::latest", self.__on_group_latest_changed))
+        self.__group_specs.append(SignalSpec.new(group, "notify::count", self.__on_group_count_changed))
+        self.__on_group_count_changed()
+        self.notification = group.latest
+
     @property
     def is_popup(self) -> bool:
         return self._is_popup
@@ -849,8 +932,43 @@ class NotificationItem(Gtk.ListBoxRow, SpecsBase):
         else:
             self.remove_css_class(css_class)
 
-    def __update_notification(self):
-        notify = self.notification
+    def reveal(self, animate: bool):
+        """
+        Shows the notification, sliding it in if ``animate``, e.g. after it is just received.
+        """
+        self.revealer.set_transition_type(Gtk.RevealerTransitionType.NONE)
+        if animate:
+            self.revealer.set_reveal_child(False)
+            if self.get_mapped():
+                self.revealer.set_reveal_child(True)
+        else:
+            self.revealer.set_reveal_child(True)
+
+    def conceal(self, callback: Callable[[], Any]):
+        """
+        Slides the notification out, then calls ``callback`` on idle.
+        ``callback`` is scheduled immediately if the row is not shown, or once the row is bound to another notification.
+        """
+        self.__finish_conceal()
+        self.__concealed = callback
+        if self.revealer.get_reveal_child() and self.get_mapped():
+            self.revealer.set_reveal_child(False)
+        else:
+            self.__finish_conceal()
+
+    def __finish_conceal(self):
+        callback, self.__concealed = self.__concealed, None
+        if not callback:
+            return
+
+        def run(*_) -> bool:
+            callback()
+            return GLib.SOURCE_REMOVE
+
+        # the list view may be binding or unbinding rows, when the model must not be changed
+        GLib.idle_add(run)
+
+    def __update_notification(self, notify: Notification):
         self.__update_urgency(notify)
 
         summary, body = notify.summary, notify.body
@@ -864,13 +982,11 @@ class NotificationItem(Gtk.ListBoxRow, SpecsBase):
         notified_at = datetime.fromtimestamp(notify.time)
         self.time.set_label(notified_at.strftime("%H:%M:%S\n%Y-%m-%d"))
 
-        if notify.icon:
-            icon = notify.icon
-            if icon.startswith("file://"):
-                icon = urllib.parse.unquote(icon).removeprefix("file://")
-            self.icon.image = icon
+        filename = get_image_filename(notify.icon)
+        if filename:
+            self.__load_image(notify, filename)
         else:
-            self.icon.image = "info-symbolic"
+            self.icon.image = notify.icon or "info-symbolic"
 
         self.actions.set_visible(len(notify.actions) != 0)
 
@@ -882,9 +998,46 @@ class NotificationItem(Gtk.ListBoxRow, SpecsBase):
         for action in notify.actions:
             button = Gtk.Button()
             button.set_label(action.label)
-            self.signal(button, "clicked", self.__on_action(action))
+            self.__notify_specs.append(SignalSpec.new(button, "clicked", self.__on_action(action)))
             self.actions.append(button)
 
+    def __load_image(self, notify: Notification, filename: str):
+        cache = NotificationImageCache.get_default()
+        size = self.icon_pixel_size * self.__scale_factor()
+        texture = cache.lookup(filename, size)
+        if texture:
+            self.icon.set_from_paintable(texture)
+            return
+
+        self.icon.image = "info-symbolic"
+        ref = weakref.ref(self)
+
+        def on_loaded(texture: Gdk.Texture | None):
+            row = ref()
+            if row is None or row.notification is not notify:
+                return
+            if texture:
+                row.icon.set_from_paintable(texture)
+            else:
+                row.icon.image = filename
+
+        cache.load(filename, size, on_loaded)
+
+    def __scale_factor(self) -> int:
+        if self.get_realized():
+            return self.get_scale_factor()
+
+        # not on a monitor yet, e.g. just created for a popup, so fit the densest one
+        display = Gdk.Display.get_default()
+        monitors: list[Gdk.Monitor] = list(display.get_monitors()) if display else []  # type: ignore
+        return max((monitor.get_scale_factor() for monitor in monitors), default=1)
+
+    def __on_scale_factor_changed(self, *_):
+        notify = self.notification
+        filename = notify and get_image_filename(notify.icon)
+        if notify and filename:
+            self.__load_image(notify, filename)
+
     def __update_urgency(self, notify: Notification):
         urgency_dict = {0: "low", 1: "normal", 2: "critical"}
         for urgency in urgency_dict:
@@ -894,45 +1047,48 @@ class NotificationItem(Gtk.ListBoxRow, SpecsBase):
             else:
                 self.remove_css_class(css_class)
 
-    def __on_closed(self, *_):
-        def callback(*_):
-            widget = self.get_ancestor(NotificationCenter)
-            if isinstance(widget, NotificationCenter):
-                widget.on_notify_closed(self.notification)
-
-        if self.revealer.get_reveal_child():
-            self.signal(self.revealer, "notify::child-revealed", callback)
-            self.revealer.set_reveal_child(False)
-        else:
-            callback()
-
-    def __on_dismissed(self, *_):
-        def callback(*_):
+    def __on_dismissed(self, notify: Notification, *_):
+        def callback():
             widget = self.get_ancestor(NotificationPopups)
             if isinstance(widget, NotificationPopups):
-                widget.on_popup_dismissed(self.notification)
+                widget.on_popup_dismissed(notify)
 
-        if self.revealer.get_reveal_child():
-            self.signal(self.revealer, "notify::child-revealed", callback)
-            self.revealer.set_reveal_child(False)
-        else:
-            callback()
+        self.conceal(callback)
+
+    def __on_group_latest_changed(self, *_):
+        if self._group and self._group.latest:
+            self.notification = self._group.latest
+            self.reveal(animate=False)
+
+    def __on_group_count_changed(self, *_):
+        earlier = self._group.count - 1 if self._group else 0
+        self.expand.set_visible(earlier > 0)
+        self.expand.set_label(f"+{earlier}")
+        self.expand.set_active(bool(self.__tree_row and self.__tree_row.get_expanded()))
+
+    @gtk_template_callback
+    def on_expand_toggled(self, *_):
+        if self._group:
+            self._group.expanded = self.expand.get_active()
+        if self.__tree_row:
+            self.__tree_row.set_expanded(self.expand.get_active())
 
     def __on_child_revealed(self, *_):
         if self.revealer.get_reveal_child():
             self.revealer.set_transition_type(Gtk.RevealerTransitionType.SLIDE_UP)
         else:
             self.revealer.set_transition_type(Gtk.RevealerTransitionType.SLIDE_DOWN)
+            self.__finish_conceal()
 
     def __on_clicked(self, *_):
         if not self.revealer.get_reveal_child():
             return
 
         if self.is_popup:
-            wm.open_window(WindowName.control_center.value)
+            lazy_windows.open(WindowName.control_center)
 
     def __on_right_clicked(self, *_):
-        if not self.revealer.get_reveal_child():
+        if not self.revealer.get_reveal_child() or not self.notification:
             return
 
         if self._is_popup:
@@ -943,67 +1099,182 @@ class NotificationItem(Gtk.ListBoxRow, SpecsBase):
     def __on_action(self, action: NotificationAction):
         def callback(_):
             action.invoke()
-            wm.close_window(WindowName.control_center.value)
+            lazy_windows.close(WindowName.control_center)
 
         return callback
 
 
 @gtk_template("controlcenter/notificationcenter")
 class NotificationCenter(Gtk.Box):
+    """
+    Lists notifications of ``NotificationService`` in a ``Gtk.ListView``, grouped by ``NotificationGroupList``.
+    A group row shows the latest notification of the group, and expands to the earlier ones.
+    The store only holds data objects, and rows are materialized for the visible ones and recycled.
+    """
+
     __gtype_name__ = "NotificationCenter"
 
     clear_all: Gtk.Button = gtk_template_child()
     stack: Gtk.Stack = gtk_template_child()
-    list_box: Gtk.ListBox = gtk_template_child()
+    list_view: Gtk.ListView = gtk_template_child()
+
+    class Factory(Gtk.SignalListItemFactory):
+        def __init__(
+            self,
+            on_bind: Callable[[NotificationItem, Gtk.TreeListRow], Any],
+            on_unbind: Callable[[NotificationItem, Gtk.TreeListRow], Any],
+        ):
+            super().__init__()
+            self.__on_bind = on_bind
+            self.__on_unbind = on_unbind
+
+            self.connect("setup", self.__class__.__item_setup)
+            self.connect("bind", self.__class__.__item_bind)
+            self.connect("unbind", self.__class__.__item_unbind)
+            self.connect("teardown", self.__class__.__item_teardown)
+
+        def __item_setup(self, item: Gtk.ListItem):
+            row = NotificationItem()
+            row.add_css_class("card")
+            row.add_css_class("my-1")
+            item.set_activatable(False)
+            item.set_child(row)
+
+        def __item_bind(self, item: Gtk.ListItem):
+            tree_row = item.get_item()
+            row = item.get_child()
+            if isinstance(tree_row, Gtk.TreeListRow) and isinstance(row, NotificationItem):
+                self.__on_bind(row, tree_row)
+
+        def __item_unbind(self, item: Gtk.ListItem):
+            tree_row = item.get_item()
+            row = item.get_child()
+            if isinstance(tree_row, Gtk.TreeListRow) and isinstance(row, NotificationItem):
+                self.__on_unbind(row, tree_row)
+                row.set_group(None)
+                row.notification = None
+
+        def __item_teardown(self, item: Gtk.ListItem):
+            row = item.get_child()
+            item.set_child()
+            if isinstance(row, NotificationItem):
+                row.run_dispose()
 
     def __init__(self):
         self.__service = NotificationService.get_default()
         super().__init__()
-        self._notifications = Gio.ListStore()
-        self.list_box.bind_model(model=self._notifications, create_widget_func=lambda i: i)
 
-        self._notifications.connect("notify::n-items", self.__on_store_changed)
-        self.__service.connect("notified", self.__on_notified)
+        self.__groups = NotificationGroupList()
+        # evicts image data of closed notifications, even if none of their images are shown
+        NotificationImageCache.get_default()
+        self.__group_rows: dict[NotificationGroup, NotificationItem] = {}
+        """Rows bound to groups, only the visible ones."""
+        self.__rows: dict[Notification, NotificationItem] = {}
+        """Rows bound to earlier notifications of expanded groups, only the visible ones."""
+        self.__fresh: set[NotificationGroup] = set()
+        """Groups created since shown, which slide in when first bound."""
+
+        self.__tree = Gtk.TreeListModel.new(self.__groups.groups, False, False, self.__create_group_model)
+        self.list_view.set_factory(self.Factory(self.__on_row_bound, self.__on_row_unbound))
+        self.list_view.set_model(Gtk.NoSelection.new(self.__tree))
+
+        self.__groups.groups.connect("notify::n-items", self.__on_store_changed)
+        weak_connect(self.__service, "notified", self.__on_notified)
 
         for notify in self.__service.notifications:
-            self.__on_notified(self.__service, notify)
+            self.__add(notify)
         self.__on_store_changed()
 
     def __on_store_changed(self, *_):
-        if self._notifications.get_n_items() != 0:
+        if self.__groups.groups.get_n_items() != 0:
             self.clear_all.set_sensitive(True)
             self.stack.set_visible_child_name("notifications")
         else:
             self.clear_all.set_sensitive(False)
             self.stack.set_visible_child_name("no-notifications")
 
-    def __find_notify(self, notify: Notification):
-        return self._notifications.find_with_equal_func(
-            notify, lambda i, n: i.notify_id == n.id and i.notify_ts == n.time
-        )
+    def __create_group_model(self, item: Any) -> Gio.ListModel | None:
+        if isinstance(item, NotificationGroup):
+            # earlier notifications, the latest one is shown by the group row
+            return Gtk.SliceListModel.new(item.notifications, 1, GLib.MAXUINT32)
+        return None
+
+    def __on_row_bound(self, row: NotificationItem, tree_row: Gtk.TreeListRow):
+        item = tree_row.get_item()
+        if isinstance(item, NotificationGroup):
+            self.__group_rows[item] = row
+            row.set_margin_start(0)
+            row.set_group(item, tree_row)
+            row.reveal(animate=item in self.__fresh)
+            self.__fresh.discard(item)
+        elif isinstance(item, Notification):
+            self.__rows[item] = row
+            row.set_margin_start(16)
+            row.notification = item
+            row.reveal(animate=False)
+
+    def __on_row_unbound(self, row: NotificationItem, tree_row: Gtk.TreeListRow):
+        item = tree_row.get_item()
+        rows: dict[Any, NotificationItem] = self.__group_rows if isinstance(item, NotificationGroup) else self.__rows
+        if rows.get(item) is row:
+            del rows[item]
+
+    def __add(self, notify: Notification):
+        if self.__groups.get_group(notify):
+            return
+        weak_connect(notify, "closed", self.__on_closed)
+        group = self.__groups.add(notify)
+        if group.count == 1:
+            self.__fresh.add(group)
+        elif group.expanded:
+            # the group is moved to the front, with a new collapsed tree row
+            tree_row = self.__tree.get_row(0)
+            if tree_row and tree_row.get_item() is group:
+                tree_row.set_expanded(True)
 
     def __on_notified(self, _, notify: Notification):
-        item = NotificationItem(notify)
-        item.is_popup = False
-        self._notifications.insert(0, item)
+        self.__add(notify)
+
+    def __on_closed(self, notify: Notification, *_):
+        group = self.__groups.get_group(notify)
+        if not group:
+            return
+
+        row = self.__group_rows.get(group) if group.latest is notify else self.__rows.get(notify)
+        if row and row.notification is notify:
+            row.conceal(lambda: self.on_notify_closed(notify))
+        else:
+            self.on_notify_closed(notify)
 
     def on_notify_closed(self, notify: Notification):
-        found, pos = self.__find_notify(notify)
-        if found:
-            item = self._notifications.get_item(pos)
-            self._notifications.remove(pos)
-            if isinstance(item, NotificationItem):
-                GLib.idle_add(lambda *_: item.run_dispose())
+        group = self.__groups.get_group(notify)
+        self.__groups.remove(notify)
+        if group and group.count == 0:
+            self.__fresh.discard(group)
 
     @gtk_template_callback
     def on_clear_all_clicked(self, *_):
-        self.__service.clear_all()
+        with _clear_all_latency.measure():
+            # remove all rows in one splice, then closed notifications are no longer found in the groups
+            self.__fresh.clear()
+            self.__groups.clear()
+            self.__service.clear_all()
         clear_dir(NOTIFICATIONS_IMAGE_DATA)
 
 
 class NotificationPopups(RevealerWindow):
+    """
+    Shows at most ``max_popups`` popups at once, and queues the rest.
+    While queued, a popup replaces an earlier queued one of the same app,
+    and the oldest queued popup is dropped when there are more than ``max_queued``.
+    Dropped and replaced popups are still listed in ``NotificationCenter``.
+    """
+
     __gtype_name__ = "IgnisNotificationPopups"
 
+    max_popups: int = 3
+    max_queued: int = 16
+
     @gtk_template("notificationpopups")
     class View(Gtk.Box):
         __gtype_name__ = "NotificationPopupsView"
@@ -1028,7 +1299,13 @@ class NotificationPopups(RevealerWindow):
         self.set_child(self.__view)
 
         self._popups = Gio.ListStore()
-        self.__view.list_box.bind_model(model=self._popups, create_widget_func=lambda i: i)
+        self.__index = PositionIndex[tuple[int, float]]()
+        self.__queue: deque[Notification] = deque()
+        self.__queued_specs: dict[Notification, list[SignalSpec]] = {}
+        """Signals of queued popups, disconnected once they leave the queue."""
+        self.__view.list_box.bind_model(
+            model=self._popups, create_widget_func=lambda item: Gtk.ListBoxRow(child=item, css_classes=["p-0"])
+        )
 
         self._popups.connect("notify::n-items", self.__on_store_changed)
         self.__service.connect("new_popup", self.__on_new_popup)
@@ -1039,22 +1316,52 @@ class NotificationPopups(RevealerWindow):
         else:
             self.set_visible(False)
 
-    def __find_popup(self, popup: Notification):
-        return self._popups.find_with_equal_func(popup, lambda i, p: i.notify_id == p.id and i.notify_ts == p.time)
-
     def __on_new_popup(self, _, popup: Notification):
-        item = NotificationItem(popup)
-        item.is_popup = True
-        self._popups.insert(0, item)
+        if _notify_key(popup) in self.__index or popup in self.__queue:
+            return
+
+        if len(self.__index) < self.max_popups:
+            self.__show_popup(popup)
+            return
+
+        for i, queued in enumerate(self.__queue):
+            if queued.app_name == popup.app_name:
+                _popups_coalesced.inc()
+                self.__queue[i] = popup
+                self.__queued_specs.pop(queued, None)
+                break
+        else:
+            self.__queue.append(popup)
+            if len(self.__queue) > self.max_queued:
+                _popups_dropped.inc()
+                self.__queued_specs.pop(self.__queue.popleft(), None)
+        self.__queued_specs[popup] = [
+            SignalSpec.new(popup, "dismissed", self.__on_queued_dismissed),
+            SignalSpec.new(popup, "closed", self.__on_queued_dismissed),
+        ]
+
+    def __show_popup(self, popup: Notification):
+        self.__index.prepend(_notify_key(popup))
+        self._popups.insert(0, NotificationItem(popup, is_popup=True))
+
+    def __on_queued_dismissed(self, popup: Notification, *_):
+        if popup in self.__queue:
+            self.__queue.remove(popup)
+        self.__queued_specs.pop(popup, None)
 
     def on_popup_dismissed(self, popup: Notification):
-        found, pos = self.__find_popup(popup)
-        if found:
+        pos = self.__index.remove(_notify_key(popup))
+        if pos is not None:
             item = self._popups.get_item(pos)
             self._popups.remove(pos)
             if isinstance(item, NotificationItem):
                 GLib.idle_add(lambda *_: item.run_dispose())
 
+        while self.__queue and len(self.__index) < self.max_popups:
+            queued = self.__queue.popleft()
+            self.__queued_specs.pop(queued, None)
+            self.__show_popup(queued)
+
 
 class ControlCenter(RevealerWindow):
     __gtype_name__ = "ControlCenter"
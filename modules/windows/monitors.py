@@ -0,0 +1,92 @@
+from collections.abc import Callable
+
+from gi.repository import Gdk, Gio, Gtk
+from ignis.widgets import Window
+from loguru import logger
+
+from ..utils.trace import trace_span
+
+
+class MonitorManager:
+    """
+    Creates per-monitor windows, keyed by monitor connectors, and keeps them in sync with monitor hotplugs.
+    Only windows of the added or removed outputs are created or destroyed;
+    windows of the remaining outputs are moved to their new monitor indexes.
+    Monitors without a connector yet are skipped until it is set.
+
+    Args:
+        factory: Creates windows for a monitor, with the monitor index and connector as arguments.
+
+    Example:
+
+    .. code-block:: python
+
+        MonitorManager(lambda idx, connector: [Topbar(idx, connector)])
+    """
+
+    def __init__(self, factory: Callable[[int, str], list[Gtk.Window]]):
+        self.__factory = factory
+        self.__windows: dict[str, list[Gtk.Window]] = {}
+        """Maps monitor connectors to their windows."""
+        self.__pending: dict[Gdk.Monitor, int] = {}
+        """Maps monitors waiting for their connector to ``notify::connector`` handler ids."""
+
+        display = Gdk.Display.get_default()
+        assert display, "no default display"
+        self.__monitors: Gio.ListModel = display.get_monitors()
+        self.__monitors.connect("items-changed", self.__on_monitors_changed)
+        self.__sync()
+
+    @property
+    def connectors(self) -> list[str]:
+        return list(self.__windows)
+
+    def get_windows(self, connector: str) -> list[Gtk.Window]:
+        return self.__windows.get(connector, [])
+
+    def __current_connectors(self) -> dict[str, int]:
+        connectors: dict[str, int] = {}
+        monitors: list[Gdk.Monitor] = []
+        for idx in range(self.__monitors.get_n_items()):
+            monitor = self.__monitors.get_item(idx)
+            if not isinstance(monitor, Gdk.Monitor):
+                continue
+            monitors.append(monitor)
+            connector = monitor.get_connector()
+            if connector:
+                connectors[connector] = idx
+            elif monitor not in self.__pending:
+                self.__pending[monitor] = monitor.connect("notify::connector", self.__on_connector_changed)
+
+        for monitor in [m for m in self.__pending if m not in monitors]:
+            monitor.disconnect(self.__pending.pop(monitor))
+        return connectors
+
+    def __on_monitors_changed(self, *_):
+        self.__sync()
+
+    def __on_connector_changed(self, monitor: Gdk.Monitor, *_):
+        handler_id = self.__pending.pop(monitor, None)
+        if handler_id is not None:
+            monitor.disconnect(handler_id)
+        self.__sync()
+
+    def __sync(self):
+        connectors = self.__current_connectors()
+
+        for connector in [c for c in self.__windows if c not in connectors]:
+            logger.info(f"monitor removed: {connector}")
+            for window in self.__windows.pop(connector):
+                window.destroy()
+
+        for connector, idx in connectors.items():
+            windows = self.__windows.get(connector)
+            if windows is None:
+                logger.info(f"monitor added: {connector}")
+                with trace_span("monitor windows", monitor=idx, connector=connector):
+                    self.__windows[connector] = self.__factory(idx, connector)
+                continue
+
+            for window in windows:
+                if isinstance(window, Window) and window.monitor != idx:
+                    window.monitor = idx
@@ -53,6 +53,7 @@ class Preferences(AdwRegularWindow):
         fcitx_kimpanel_enabled: Adw.SwitchRow = gtk_template_child()
         fcitx_show_popup: Adw.SwitchRow = gtk_template_child()
         fcitx_vertical_list: Adw.SwitchRow = gtk_template_child()
+        popup_dispose_delay: Adw.SpinRow = gtk_template_child()
 
         def __init__(self):
             super().__init__()
@@ -119,6 +120,9 @@ class Preferences(AdwRegularWindow):
             # on screen display
             bind_option(user_options.osd, "timeout", self.osd_timeout, "value")
 
+            # popup windows
+            bind_option(user_options.popup_windows, "dispose_delay", self.popup_dispose_delay, "value")
+
             # topbar
             bind_option(user_options.topbar, "exclusive", self.topbar_exclusive, "active")
             bind_option(user_options.topbar, "focusable", self.topbar_focusable, "active")
@@ -0,0 +1,467 @@
+import abc
+import ast
+import dataclasses
+import math
+import operator
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from os import path
+from typing import Any, ClassVar
+
+from gi.repository import Gdk, Gio, GLib, Gtk
+from ignis.gobject import IgnisGObject
+from ignis.variable import Variable
+from loguru import logger
+
+from ..services import WindowIndexDelta, WindowIndexService
+from ..utils import (
+    FuzzyIndex,
+    GProperty,
+    counter_metric,
+    get_app_icon_name,
+    get_app_id,
+    latency_metric,
+    weak_connect,
+)
+
+_executors: dict[str, ThreadPoolExecutor] = {}
+"""A worker thread per provider, shared by all pipelines."""
+_provider_errors = (OSError, ValueError, GLib.Error)
+"""Errors of a provider which are logged, instead of breaking the pipeline."""
+
+
+@dataclasses.dataclass
+class SearchHit:
+    """
+    A plain search result produced by a provider, safe to be passed between threads.
+    """
+
+    key: str
+    name: str
+    description: str
+    icon_name: str
+    score: float
+    activate: Callable[[], Any]
+
+
+class SearchResult(IgnisGObject):
+    """
+    A launcher row for a ``SearchHit``, with the same display properties as ``AppEntry``.
+    """
+
+    def __init__(self, hit: SearchHit, provider: str):
+        super().__init__()
+        self._hit = hit
+        self._provider = provider
+
+    @GProperty
+    def id(self) -> str:
+        return f"{self._provider}:{self._hit.key}"
+
+    @GProperty
+    def name(self) -> str:
+        return self._hit.name
+
+    @GProperty
+    def description(self) -> str:
+        return self._hit.description
+
+    @GProperty
+    def icon_name(self) -> str:
+        return self._hit.icon_name
+
+    @GProperty
+    def is_pinned(self) -> bool:
+        return False
+
+    @GProperty
+    def score(self) -> float:
+        return self._hit.score
+
+    @GProperty
+    def provider(self) -> str:
+        return self._provider
+
+    def activate(self):
+        try:
+            self._hit.activate()
+        except GLib.Error as e:
+            logger.warning(f"failed to activate search result {self.id}: {e}")
+
+
+class SearchProvider(abc.ABC):
+    """
+    A source of launcher results besides applications.
+
+    ``prepare`` runs on the main thread and returns an immutable snapshot of the data to search,
+    then ``update_index`` and ``search`` run on the provider's own worker thread.
+    ``update_index`` rebuilds cached indexes when the snapshot is changed, and is not counted in the budget.
+    ``search`` should check ``expired()`` in its loops, and return ``None`` once it becomes true,
+    i.e. when the query is cancelled or its budget runs out, so that partial results are never shown.
+    """
+
+    name: str = ""
+    budget_ms: float = 10
+    """Time budget of a single query."""
+    max_results: int = 8
+
+    def prepare(self) -> Any:
+        return None
+
+    def update_index(self, data: Any):
+        return
+
+    @abc.abstractmethod
+    def search(self, data: Any, query: str, expired: Callable[[], bool]) -> list[SearchHit] | None: ...
+
+    @classmethod
+    def top_hits(cls, hits: list[SearchHit]) -> list[SearchHit]:
+        return sorted(hits, key=lambda hit: (-hit.score, hit.name))[: cls.max_results]
+
+
+class WindowsProvider(SearchProvider):
+    """
+    Open windows of niri or Hyprland, activated by focusing.
+    """
+
+    name = "windows"
+    budget_ms = 5
+
+    def __init__(self):
+        self.__index = WindowIndexService.get_default()
+        self.__windows: tuple[tuple[int, str, str, str], ...] | None = None
+        self.__indexed: tuple[tuple[int, str, str, str], ...] | None = None
+        self.__fuzzy = FuzzyIndex()
+        weak_connect(self.__index, "changed", self.__on_changed)
+
+    def prepare(self) -> tuple[tuple[int, str, str, str], ...]:
+        if self.__windows is None:
+            self.__windows = tuple(
+                (win.id, win.title, get_app_id(win.app_id), get_app_icon_name(win.app_id))
+                for win in self.__index.windows
+            )
+        return self.__windows
+
+    def update_index(self, data: tuple[tuple[int, str, str, str], ...]):
+        if data is not self.__indexed:
+            fuzzy = FuzzyIndex()
+            for window_id, title, app_id, _ in data:
+                fuzzy.add(str(window_id), [(title, 3), (app_id, 2)])
+            self.__indexed, self.__fuzzy = data, fuzzy
+
+    def search(self, data: tuple[tuple[int, str, str, str], ...], query, expired) -> list[SearchHit] | None:
+        result = self.__fuzzy.search(query, cancelled=expired)
+        if result is None:
+            return None
+
+        hits: list[SearchHit] = []
+        for window_id, title, app_id, icon_name in data:
+            if expired():
+                return None
+            score = result.get(str(window_id))
+            if score:
+                hits.append(SearchHit(str(window_id), title, app_id, icon_name, score, self.__focus(window_id)))
+        return self.top_hits(hits)
+
+    def __on_changed(self, _, variable: Variable):
+        delta: WindowIndexDelta = variable.value
+        if delta.added or delta.removed or delta.changed:
+            self.__windows = None
+
+    def __focus(self, window_id: int) -> Callable[[], Any]:
+        def focus():
+            window = self.__index.get_window(window_id)
+            if window:
+                window.focus()
+
+        return focus
+
+
+class CalculatorProvider(SearchProvider):
+    """
+    Evaluates arithmetic expressions, activated by copying the result to the clipboard.
+    """
+
+    name = "calculator"
+    budget_ms = 2
+
+    binary_operators: ClassVar[dict[type, Callable[[Any, Any], Any]]] = {
+        ast.Add: operator.add,
+        ast.Sub: operator.sub,
+        ast.Mult: operator.mul,
+        ast.Div: operator.truediv,
+        ast.FloorDiv: operator.floordiv,
+        ast.Mod: operator.mod,
+        ast.Pow: operator.pow,
+    }
+    unary_operators: ClassVar[dict[type, Callable[[Any], Any]]] = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+    functions: ClassVar[dict[str, Callable[..., Any]]] = {
+        name: getattr(math, name)
+        for name in ["sqrt", "exp", "log", "log2", "log10", "sin", "cos", "tan", "asin", "acos", "atan", "floor"]
+    } | {"ceil": math.ceil, "abs": abs, "round": round}
+    constants: ClassVar[dict[str, float]] = {"pi": math.pi, "e": math.e, "tau": math.tau}
+
+    def search(self, data, query, expired) -> list[SearchHit] | None:
+        expression = query.strip().removeprefix("=").replace("^", "**")
+        if not expression or not any(c.isdigit() for c in expression):
+            return []
+
+        try:
+            value = self.__eval(ast.parse(expression, mode="eval").body)
+            if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+                value = int(value)
+            text = str(value)
+        except (SyntaxError, ValueError, TypeError, ArithmeticError, RecursionError):
+            return []
+
+        return [SearchHit("result", text, f"{query.strip()} =", "accessories-calculator", 100, lambda: _copy(text))]
+
+    def __eval(self, node: ast.AST) -> int | float:
+        match node:
+            case ast.Constant(value=int() | float() as value) if not isinstance(value, bool):
+                return value
+            case ast.Name(id=name) if name in self.constants:
+                return self.constants[name]
+            case ast.UnaryOp(op=op, operand=operand) if type(op) in self.unary_operators:
+                return self.unary_operators[type(op)](self.__eval(operand))
+            case ast.BinOp(left=left, op=op, right=right) if type(op) in self.binary_operators:
+                lhs, rhs = self.__eval(left), self.__eval(right)
+                if isinstance(op, ast.Pow) and (abs(rhs) > 1024 or abs(lhs) > 1e6):
+                    raise ValueError("exponent too large")
+                return self.binary_operators[type(op)](lhs, rhs)
+            case ast.Call(func=ast.Name(id=name), args=args, keywords=[]) if name in self.functions:
+                return self.functions[name](*[self.__eval(arg) for arg in args])
+        raise ValueError("unsupported expression")
+
+
+class PathProvider(SearchProvider):
+    """
+    Executables in ``$PATH``, activated by spawning them directly.
+    The index is built on the worker thread, and rebuilt when ``$PATH`` or any of its directories change.
+    """
+
+    name = "path"
+    budget_ms = 20
+
+    def __init__(self):
+        self.__signature: tuple | None = None
+        self.__index = FuzzyIndex()
+        self.__executables: dict[str, str] = {}
+
+    def update_index(self, data):
+        dirs = [dirname for dirname in os.environ.get("PATH", "").split(os.pathsep) if dirname]
+        signature = tuple((dirname, _mtime(dirname)) for dirname in dirs)
+        if signature == self.__signature:
+            return
+
+        executables: dict[str, str] = {}
+        for dirname in dirs:
+            try:
+                with os.scandir(dirname) as it:
+                    for entry in it:
+                        if entry.name not in executables and entry.is_file() and os.access(entry.path, os.X_OK):
+                            executables[entry.name] = entry.path
+            except OSError:
+                continue
+
+        index = FuzzyIndex()
+        for name in executables:
+            index.add(name, [(name, 1)])
+        self.__signature, self.__index, self.__executables = signature, index, executables
+
+    def search(self, data, query, expired) -> list[SearchHit] | None:
+        if len(query.strip()) < 2:
+            return []
+
+        result = self.__index.search(query.strip().split()[0], cancelled=expired)
+        if result is None:
+            return None
+
+        hits: list[SearchHit] = []
+        for name, score in result.items():
+            if expired():
+                return None
+            filename = self.__executables.get(name)
+            if filename:
+                hits.append(
+                    SearchHit(name, name, filename, "application-x-executable", score, lambda f=filename: _spawn(f))
+                )
+        return self.top_hits(hits)
+
+
+class RecentFilesProvider(SearchProvider):
+    """
+    Recently used files from ``Gtk.RecentManager``, activated by opening with the default application.
+    Files which no longer exist are filtered out on the worker thread, when the index is rebuilt.
+    """
+
+    name = "recent"
+    budget_ms = 20
+
+    def __init__(self):
+        self.__manager = Gtk.RecentManager.get_default()
+        self.__items: tuple[tuple[str, str, str], ...] | None = None
+        self.__indexed: tuple[tuple[str, str, str], ...] | None = None
+        self.__existing: list[tuple[str, str, str]] = []
+        self.__index = FuzzyIndex()
+        weak_connect(self.__manager, "changed", self.__on_changed)
+
+    def prepare(self) -> tuple[tuple[str, str, str], ...]:
+        if self.__items is None:
+            self.__items = tuple(
+                (info.get_uri(), info.get_display_name(), _content_type_icon_name(info.get_mime_type()))
+                for info in self.__manager.get_items()
+            )
+        return self.__items
+
+    def update_index(self, data: tuple[tuple[str, str, str], ...]):
+        if data is not self.__indexed:
+            existing = [item for item in data if _uri_exists(item[0])]
+            index = FuzzyIndex()
+            for uri, display_name, _ in existing:
+                index.add(uri, [(display_name, 1.5)])
+            self.__indexed, self.__existing, self.__index = data, existing, index
+
+    def search(self, data: tuple[tuple[str, str, str], ...], query, expired) -> list[SearchHit] | None:
+        if len(query.strip()) < 3:
+            return []
+
+        result = self.__index.search(query, cancelled=expired)
+        if result is None:
+            return None
+
+        hits: list[SearchHit] = []
+        for uri, display_name, icon_name in self.__existing:
+            if expired():
+                return None
+            score = result.get(uri)
+            if score:
+                hits.append(SearchHit(uri, display_name, uri, icon_name, score, lambda uri=uri: _open_uri(uri)))
+        return self.top_hits(hits)
+
+    def __on_changed(self, *_):
+        self.__items = None
+
+
+class ProviderPipeline:
+    """
+    Runs every provider on its own worker thread for each query, and streams results into per-provider list stores.
+
+    A query bumps the generation, which cancels in-flight searches of older queries, and results of them are dropped.
+    A search which runs out of its budget gives up and clears the provider's store instead of showing partial results,
+    so a slow provider only loses its own results, and never delays the other providers or the main loop.
+    Complete results are always shown, and ones which finish late only count as overruns.
+    """
+
+    def __init__(self, providers: list[SearchProvider]):
+        self.__providers = providers
+        self.__generation: int = 0
+        self.__stores = {provider.name: Gio.ListStore() for provider in providers}
+        self.__budgets = {provider.name: provider.budget_ms for provider in providers}
+        self.__latencies = {name: latency_metric(f"applauncher.provider.{name}") for name in self.__stores}
+        self.__overruns = {name: counter_metric(f"applauncher.provider.{name}.overrun") for name in self.__stores}
+
+    @property
+    def stores(self) -> list[Gio.ListStore]:
+        return list(self.__stores.values())
+
+    def search(self, query: str):
+        self.__generation += 1
+        generation = self.__generation
+
+        if not query.strip():
+            for store in self.__stores.values():
+                store.remove_all()
+            return
+
+        for provider in self.__providers:
+            try:
+                data = provider.prepare()
+            except _provider_errors as e:
+                logger.warning(f"search provider {provider.name} failed to prepare: {e}")
+                continue
+            executor = _executors.get(provider.name)
+            if executor is None:
+                executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"search-{provider.name}")
+                _executors[provider.name] = executor
+            executor.submit(self.__run, provider, data, query, generation)
+
+    def __run(self, provider: SearchProvider, data: Any, query: str, generation: int):
+        def cancelled() -> bool:
+            return generation != self.__generation
+
+        if cancelled():
+            return
+
+        try:
+            provider.update_index(data)
+        except _provider_errors as e:
+            logger.warning(f"search provider {provider.name} failed to update index: {e}")
+
+        begin = time.perf_counter()
+        deadline = begin + provider.budget_ms / 1000
+
+        def expired() -> bool:
+            return cancelled() or time.perf_counter() > deadline
+
+        try:
+            hits = provider.search(data, query, expired)
+        except _provider_errors as e:
+            logger.warning(f"search provider {provider.name} failed: {e}")
+            hits = []
+
+        elapsed_ms = (time.perf_counter() - begin) * 1000
+        if not cancelled():
+            GLib.idle_add(self.__apply, provider.name, generation, hits, elapsed_ms)
+
+    def __apply(self, name: str, generation: int, hits: list[SearchHit] | None, elapsed_ms: float) -> bool:
+        if generation == self.__generation:
+            self.__latencies[name].record(elapsed_ms)
+            if hits is None or elapsed_ms > self.__budgets[name]:
+                self.__overruns[name].inc()
+            # results of the previous query are outdated, even if the search gave up
+            hits = hits or []
+            store = self.__stores[name]
+            store.splice(0, store.get_n_items(), [SearchResult(hit, name) for hit in hits])
+        return GLib.SOURCE_REMOVE
+
+
+def _mtime(filename: str) -> float:
+    try:
+        return path.getmtime(filename)
+    except OSError:
+        return 0
+
+
+def _uri_exists(uri: str) -> bool:
+    """
+    Like ``Gtk.RecentInfo.exists()``, which only checks local files, but safe to be called from another thread.
+    """
+    if not uri.startswith("file://"):
+        return True
+    try:
+        filename, _ = GLib.filename_from_uri(uri)
+    except GLib.Error:
+        return False
+    return path.exists(filename)
+
+
+def _content_type_icon_name(content_type: str | None) -> str:
+    icon_name = content_type and Gio.content_type_get_generic_icon_name(content_type)
+    return icon_name or "text-x-generic"
+
+
+def _copy(text: str):
+    display = Gdk.Display.get_default()
+    if display:
+        display.get_clipboard().set(text)
+
+
+def _spawn(filename: str):
+    Gio.Subprocess.new([filename], Gio.SubprocessFlags.NONE)
+
+
+def _open_uri(uri: str):
+    Gio.AppInfo.launch_default_for_uri(uri, None)
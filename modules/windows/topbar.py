@@ -13,10 +13,10 @@ class Topbar(Window):
     class View(Gtk.CenterBox):
         __gtype_name__ = "TopbarView"
 
-    def __init__(self, monitor: int = 0):
+    def __init__(self, monitor: int = 0, connector: str | None = None):
         self.__options = user_options and user_options.topbar
         super().__init__(
-            namespace=f"{WindowName.top_bar.value}-{monitor}",
+            namespace=f"{WindowName.top_bar.value}-{connector or monitor}",
             monitor=monitor,
             anchor=["top", "left", "right"],
             css_classes=["topbar"],
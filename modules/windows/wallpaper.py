@@ -5,7 +5,7 @@ from ignis.utils.monitor import get_monitor
 from ignis.widgets import Window
 
 from ..useroptions import user_options
-from ..utils import connect_option
+from ..utils import connect_option, weak_connect
 from ..widgets import BlurredPicture
 
 niri = NiriService.get_default()
@@ -14,18 +14,13 @@ niri = NiriService.get_default()
 class WallpaperWindow(Window):
     __gtype_name__ = "IgnisBackdropWallpaper"
 
-    def __init__(self, monitor_idx: int, is_backdrop: bool = False):
+    def __init__(self, monitor_idx: int, is_backdrop: bool = False, connector: str | None = None):
         self.__is_backdrop = is_backdrop
         self.__picture = BlurredPicture()
         self.__picture.set_content_fit(Gtk.ContentFit.COVER)
 
-        monitor = get_monitor(monitor_idx)
-        if monitor:
-            geometry = monitor.get_geometry()
-            self.__picture.set_size_request(geometry.width, geometry.height)
-
         super().__init__(
-            namespace=f"ignis_wallpaper_{'backdrop' if is_backdrop else 'service'}_{monitor_idx}",
+            namespace=f"ignis_wallpaper_{'backdrop' if is_backdrop else 'service'}_{connector or monitor_idx}",
             monitor=monitor_idx,
             anchor=["top", "right", "bottom", "left"],
             exclusivity="ignore",
@@ -39,12 +34,14 @@ class WallpaperWindow(Window):
         else:
             self.add_css_class("wallpaper")
 
+        self.__on_monitor_changed()
         self.__on_overview_opened()
         self.__on_blur_radius_changed()
         self.__on_margin_changed()
 
+        self.connect("notify::monitor", self.__on_monitor_changed)
         if niri.is_available:
-            niri.connect("notify::overview-opened", self.__on_overview_opened)
+            weak_connect(niri, "notify::overview-opened", self.__on_overview_opened)
 
         if options and options.wallpaper:
             connect_option(options.wallpaper, "wallpaper_path", self.__load_picture)
@@ -57,6 +54,12 @@ class WallpaperWindow(Window):
                 connect_option(user_options.wallpaper, "blur_radius", self.__on_blur_radius_changed)
                 connect_option(user_options.wallpaper, "bottom_margin", self.__on_margin_changed)
 
+    def __on_monitor_changed(self, *_):
+        monitor = get_monitor(self.monitor)
+        if monitor:
+            geometry = monitor.get_geometry()
+            self.__picture.set_size_request(geometry.width, geometry.height)
+
     def __on_blur_radius_changed(self, *_):
         opts = user_options and user_options.wallpaper
         if opts: